@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from offers_app.models import Offer
+from reviews_app.models import Review
+from . import stats
+
+CustomUser = get_user_model()
+
+
+@receiver(post_save, sender=Offer)
+def count_created_offer(sender, instance, created, **kwargs):
+    if created:
+        stats.apply_delta(offer_count=1)
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, instance, **kwargs):
+    stats.apply_delta(offer_count=-1)
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    """
+    Adds a new review to the counters, or the rating difference of an
+    updated one (loaded_rating is still the stored rating at this point).
+    """
+    if created:
+        stats.apply_delta(review_count=1, rating_sum=instance.rating)
+    else:
+        stats.apply_delta(rating_sum=instance.rating - instance.loaded_rating)
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    stats.apply_delta(review_count=-1, rating_sum=-instance.loaded_rating)
+
+
+@receiver(post_save, sender=CustomUser)
+def count_saved_user(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Counts new business users and users whose type changed from or to
+    'business' (loaded_profile_values still holds the stored type here).
+    """
+    if created:
+        if instance.type == 'business':
+            stats.apply_delta(business_profile_count=1)
+    elif 'type' in instance.get_changed_profile_fields(update_fields):
+        was_business = instance.loaded_profile_values['type'] == 'business'
+        stats.apply_delta(business_profile_count=int(instance.type == 'business') - int(was_business))
+
+
+@receiver(post_delete, sender=CustomUser)
+def count_deleted_user(sender, instance, **kwargs):
+    if instance.type == 'business':
+        stats.apply_delta(business_profile_count=-1)
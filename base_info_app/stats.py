@@ -0,0 +1,198 @@
+"""
+Platform statistics snapshot for GET /api/base-info/.
+
+The snapshot (review count, rating sum, business user count and offer count)
+lives in the cache as one counter per value plus the time it was computed.
+It is computed with a single combined query, then kept current by
+`apply_delta()`, which the model signals in base_info_app.signals call after
+each commit. Requests read it from the cache only: a snapshot older than
+BASE_INFO_STATS_REFRESH_INTERVAL is still served, but triggers a background
+recomputation (stale-while-revalidate) that also corrects any drift of the
+counters (logged as a warning). Every applied delta bumps a version counter,
+so a recomputation that overlapped with one is repeated instead of
+overwriting it. The cache is per process, so this reconciliation has to run
+in the serving process; there is no separate command for it.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from offers_app.models import Offer
+from reviews_app.models import BusinessRatingSummary
+
+logger = logging.getLogger(__name__)
+
+CustomUser = get_user_model()
+
+CACHE_PREFIX = 'base_info:stats'
+COUNTERS = ('review_count', 'rating_sum', 'business_profile_count', 'offer_count')
+COMPUTED_AT_KEY = f'{CACHE_PREFIX}:computed_at'
+VERSION_KEY = f'{CACHE_PREFIX}:version'
+REFRESH_LOCK_KEY = f'{CACHE_PREFIX}:refreshing'
+REFRESH_LOCK_TIMEOUT = 60
+REFRESH_ATTEMPTS = 3
+
+_executor = None
+
+
+def counter_key(name):
+    return f'{CACHE_PREFIX}:{name}'
+
+
+def compute_snapshot():
+    """
+    Counts everything with one query of four scalar subqueries. Reviews are
+    summed from the per-business rating summaries rather than counted.
+    """
+    quote = connection.ops.quote_name
+    summary_table = quote(BusinessRatingSummary._meta.db_table)
+    sql = f"""
+        SELECT
+            (SELECT COALESCE(SUM({quote('review_count')}), 0) FROM {summary_table}),
+            (SELECT COALESCE(SUM({quote('rating_sum')}), 0) FROM {summary_table}),
+            (SELECT COUNT(*) FROM {quote(CustomUser._meta.db_table)} WHERE {quote('type')} = %s),
+            (SELECT COUNT(*) FROM {quote(Offer._meta.db_table)})
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, ['business'])
+        row = cursor.fetchone()
+    return dict(zip(COUNTERS, row))
+
+
+def store_snapshot(snapshot):
+    values = {counter_key(name): snapshot[name] for name in COUNTERS}
+    values[COMPUTED_AT_KEY] = time.time()
+    cache.set_many(values, None)
+
+
+def get_version():
+    cache.add(VERSION_KEY, 0, None)
+    return cache.get(VERSION_KEY)
+
+
+def invalidate_snapshot():
+    cache.delete_many([counter_key(name) for name in COUNTERS] + [COMPUTED_AT_KEY])
+
+
+def refresh_snapshot():
+    """
+    Recomputes the snapshot, stores it and returns it. A delta applied while
+    the query runs may or may not be part of its result, so the computation is
+    repeated if the version changed in the meantime. If it keeps changing, the
+    last result is stored as outdated, so the next request refreshes it again.
+    """
+    for _ in range(REFRESH_ATTEMPTS):
+        version = get_version()
+        snapshot = compute_snapshot()
+        store_snapshot(snapshot)
+        if get_version() == version:
+            return snapshot
+    cache.set(COMPUTED_AT_KEY, 0, None)
+    return snapshot
+
+
+def get_cached_snapshot():
+    """
+    Returns (snapshot, computed_at) from the cache, or (None, None) if any
+    part of it is missing.
+    """
+    keys = [counter_key(name) for name in COUNTERS] + [COMPUTED_AT_KEY]
+    values = cache.get_many(keys)
+    if len(values) != len(keys):
+        return None, None
+    return {name: values[counter_key(name)] for name in COUNTERS}, values[COMPUTED_AT_KEY]
+
+
+def log_drift(cached, snapshot):
+    drift = {name: cached[name] - snapshot[name] for name in COUNTERS if cached[name] != snapshot[name]}
+    if drift:
+        logger.warning(
+            "Platform statistics drifted: %s",
+            ", ".join(f"{name} {value:+d}" for name, value in drift.items())
+        )
+
+
+def _refresh_in_background():
+    try:
+        cached, _ = get_cached_snapshot()
+        snapshot = refresh_snapshot()
+        if cached is not None:
+            log_drift(cached, snapshot)
+    except Exception:
+        logger.exception("Refreshing the platform statistics failed")
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+        if settings.BASE_INFO_STATS_WORKERS:
+            connection.close()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BASE_INFO_STATS_WORKERS,
+            thread_name_prefix='base-info-stats'
+        )
+    return _executor
+
+
+def schedule_refresh():
+    """Queues one background refresh; does nothing if one is already running."""
+    if not cache.add(REFRESH_LOCK_KEY, 1, REFRESH_LOCK_TIMEOUT):
+        return
+    if not settings.BASE_INFO_STATS_WORKERS:
+        _refresh_in_background()
+        return
+    get_executor().submit(_refresh_in_background)
+
+
+def wait_for_pending():
+    """Blocks until a queued refresh is finished."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def get_snapshot():
+    """
+    Returns the current snapshot. Only a missing snapshot is computed in the
+    request; an outdated one is returned as is and refreshed in the background.
+    """
+    snapshot, computed_at = get_cached_snapshot()
+    if snapshot is None:
+        return refresh_snapshot()
+    if time.time() - computed_at > settings.BASE_INFO_STATS_REFRESH_INTERVAL:
+        schedule_refresh()
+    return snapshot
+
+
+def _apply(deltas):
+    """
+    Adds `deltas` to the cached counters after bumping the version. If any
+    counter is missing, the whole snapshot is dropped instead of being left
+    partly updated; the next request computes a complete one.
+    """
+    get_version()
+    cache.incr(VERSION_KEY)
+    for name, delta in deltas.items():
+        try:
+            cache.incr(counter_key(name), delta)
+        except ValueError:
+            invalidate_snapshot()
+            return
+
+
+def apply_delta(**deltas):
+    """
+    Adjusts the cached counters by `deltas` (e.g. offer_count=1) once the
+    surrounding transaction commits, so rolled back writes never count.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: _apply(deltas))
@@ -5,10 +5,16 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase
 import decimal # Für Decimal-Vergleiche
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import override_settings
 
 # Importiere Modelle aus anderen Apps (Pfade ggf. anpassen)
 from offers_app.models import Offer, OfferDetail, Category
 from reviews_app.models import Review
+from offers_app.importer import OfferImporter
+from base_info_app import stats
 # from user_auth_app.models import CustomUser # Oder: CustomUser = get_user_model()
 
 CustomUser = get_user_model()
@@ -57,6 +63,9 @@ class BaseInfoAPITests(APITestCase):
         # --- URL ---
         cls.base_info_url = reverse('base_app_api:base-info') # Passe Namespace an, falls nötig
 
+    def setUp(self):
+        cache.clear()
+
     def test_get_base_info_success(self):
         """ Testet erfolgreichen Abruf der Basis-Infos mit Daten """
         response = self.client.get(self.base_info_url)
@@ -117,4 +126,140 @@ class BaseInfoAPITests(APITestCase):
         self.assertEqual(response.data['review_count'], 0)
         self.assertIsNone(response.data['average_rating'])
         self.assertEqual(response.data['business_profile_count'], 0)
-        self.assertEqual(response.data['offer_count'], 0)
\ No newline at end of file
+        self.assertEqual(response.data['offer_count'], 0)
+
+
+@override_settings(BASE_INFO_STATS_WORKERS=0)
+class BaseInfoSnapshotTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_user = CustomUser.objects.create_user(
+            username='snapshot_b1', email='snapshot_b1@example.com', type='business', password='pw'
+        )
+        cls.customer_user = CustomUser.objects.create_user(
+            username='snapshot_c1', email='snapshot_c1@example.com', type='customer', password='pw'
+        )
+        cls.offer = Offer.objects.create(user=cls.business_user, title="Snapshot Offer")
+        cls.review = Review.objects.create(reviewer=cls.customer_user, reviewed_user=cls.business_user, rating=4)
+        cls.base_info_url = reverse('base_app_api:base-info')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_snapshot_single_query_then_cached(self):
+        """ Testet, dass der Snapshot mit einer Abfrage berechnet und danach ohne Datenbank ausgeliefert wird """
+        with self.assertNumQueries(1):
+            first = self.client.get(self.base_info_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.base_info_url, HTTP_AUTHORIZATION='Token ungueltig')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first.data, {
+            'review_count': 1, 'average_rating': 4.0, 'business_profile_count': 1, 'offer_count': 1
+        })
+
+    def test_counters_follow_model_signals(self):
+        """ Testet die inkrementelle Aktualisierung der Zähler nach dem Commit """
+        self.client.get(self.base_info_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            other_business = CustomUser.objects.create_user(
+                username='snapshot_b2', email='snapshot_b2@example.com', type='business', password='pw'
+            )
+            Offer.objects.create(user=other_business, title="Zweites Angebot")
+            Review.objects.create(reviewer=self.customer_user, reviewed_user=other_business, rating=1)
+            self.review.rating = 5
+            self.review.save()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data, {
+            'review_count': 2, 'average_rating': 3.0, 'business_profile_count': 2, 'offer_count': 2
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other_business.delete()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data, {
+            'review_count': 1, 'average_rating': 5.0, 'business_profile_count': 1, 'offer_count': 1
+        })
+
+    def test_user_type_change_counted(self):
+        """ Testet, dass ein Wechsel des Benutzertyps den Business-Zähler anpasst """
+        self.client.get(self.base_info_url)
+        customer = CustomUser.objects.get(pk=self.customer_user.pk)
+        customer.type = 'business'
+        with self.captureOnCommitCallbacks(execute=True):
+            customer.save(update_fields=['type'])
+            customer.save()
+        self.assertEqual(self.client.get(self.base_info_url).data['business_profile_count'], 2)
+
+    def test_bulk_writes_counted(self):
+        """ Testet, dass Massenimporte von Angeboten und Benutzern die Zähler ohne Signale anpassen """
+        self.client.get(self.base_info_url)
+        detail = {"title": "Basic", "price": 10, "delivery_time_in_days": 2, "revisions": 1, "offer_type": "basic"}
+        with self.captureOnCommitCallbacks(execute=True):
+            OfferImporter(self.business_user, batch_size=2).import_items(
+                [{"title": f"Import {i}", "details": [detail]} for i in range(3)]
+            )
+            CustomUser.objects.bulk_create([
+                CustomUser(username='bulk_b1', email='bulk_b1@example.com', type='business'),
+                CustomUser(username='bulk_c1', email='bulk_c1@example.com', type='customer'),
+            ])
+        with self.assertNumQueries(0):
+            response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data['offer_count'], 4)
+        self.assertEqual(response.data['business_profile_count'], 2)
+
+    def test_stale_snapshot_served_then_refreshed(self):
+        """ Testet stale-while-revalidate: ein veralteter Snapshot wird ausgeliefert und danach erneuert """
+        self.client.get(self.base_info_url)
+        Offer.objects.bulk_create([Offer(user=self.business_user, title=f"Ohne Signal {i}") for i in range(2)])
+        response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data['offer_count'], 1)
+
+        cache.set(stats.COMPUTED_AT_KEY, time.time() - 3600, None)
+        response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data['offer_count'], 1)
+        response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data['offer_count'], 3)
+
+    def test_delta_during_refresh_not_lost(self):
+        """ Testet, dass ein während der Neuberechnung angewendetes Delta eine erneute Berechnung auslöst """
+        self.client.get(self.base_info_url)
+        compute_snapshot = stats.compute_snapshot
+        calls = []
+
+        def compute_with_concurrent_write():
+            snapshot = compute_snapshot()
+            if not calls:
+                Offer.objects.bulk_create([Offer(user=self.business_user, title="Gleichzeitig")])
+                stats._apply({'offer_count': 1})
+            calls.append(snapshot)
+            return snapshot
+
+        with mock.patch.object(stats, 'compute_snapshot', side_effect=compute_with_concurrent_write):
+            snapshot = stats.refresh_snapshot()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(snapshot['offer_count'], 2)
+        self.assertEqual(stats.get_cached_snapshot()[0]['offer_count'], 2)
+
+    def test_missing_counter_drops_whole_snapshot(self):
+        """ Testet, dass ein fehlender Zähler den ganzen Snapshot verwirft statt ihn teilweise zu ändern """
+        self.client.get(self.base_info_url)
+        cache.delete(stats.counter_key('offer_count'))
+        with self.captureOnCommitCallbacks(execute=True):
+            stats.apply_delta(review_count=1, offer_count=1)
+        self.assertEqual(stats.get_cached_snapshot(), (None, None))
+        self.assertIsNone(cache.get(stats.counter_key('review_count')))
+        self.assertEqual(self.client.get(self.base_info_url).data['review_count'], 1)
+
+    def test_stale_refresh_fixes_and_logs_drift(self):
+        """ Testet, dass die Hintergrund-Erneuerung abweichende Zähler im laufenden Prozess korrigiert und meldet """
+        self.client.get(self.base_info_url)
+        cache.incr(stats.counter_key('offer_count'), 5)
+        cache.set(stats.COMPUTED_AT_KEY, time.time() - 3600, None)
+        with self.assertLogs('base_info_app.stats', level='WARNING') as logs:
+            response = self.client.get(self.base_info_url)
+        self.assertEqual(response.data['offer_count'], 6)
+        self.assertIn('offer_count +5', logs.output[0])
+        self.assertEqual(self.client.get(self.base_info_url).data['offer_count'], 1)
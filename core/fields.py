@@ -0,0 +1,56 @@
+from django.urls import get_script_prefix, get_urlconf
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+# Stand-in lookup value used to find the id's position in a reversed URL.
+URL_TEMPLATE_SENTINEL = 7318249056413
+_sentinel_paths = {}
+
+
+class TemplatedHyperlinkedIdentityField(serializers.HyperlinkedIdentityField):
+    """
+    HyperlinkedIdentityField that resolves its URL pattern only once.
+
+    The view is reversed once per process (per urlconf and script prefix) with
+    a sentinel id, and made absolute once per request; every object's URL is
+    then produced by formatting its id into that template. Produces the same
+    URLs as HyperlinkedIdentityField for integer lookups; anything else
+    (format suffixes, versioning, non-integer lookups) falls back to it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._template_request = None
+        self._template = None
+
+    def get_sentinel_path(self, view_name):
+        key = (view_name, self.lookup_url_kwarg, get_urlconf(), get_script_prefix())
+        if key not in _sentinel_paths:
+            path = reverse(view_name, kwargs={self.lookup_url_kwarg: URL_TEMPLATE_SENTINEL})
+            _sentinel_paths[key] = path if path.count(str(URL_TEMPLATE_SENTINEL)) == 1 else None
+        return _sentinel_paths[key]
+
+    def get_url_template(self, view_name, request):
+        if request is not None and getattr(request, 'versioning_scheme', None) is not None:
+            return None
+        if self._template_request is not request or self._template is None:
+            path = self.get_sentinel_path(view_name)
+            if path is None:
+                return None
+            url = request.build_absolute_uri(path) if request is not None else path
+            self._template = (
+                url.replace('{', '{{').replace('}', '}}').replace(str(URL_TEMPLATE_SENTINEL), '{}')
+            )
+            self._template_request = request
+        return self._template
+
+    def get_url(self, obj, view_name, request, format):
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+        lookup_value = getattr(obj, self.lookup_field)
+        if format or type(lookup_value) is not int:
+            return super().get_url(obj, view_name, request, format)
+        template = self.get_url_template(view_name, request)
+        if template is None:
+            return super().get_url(obj, view_name, request, format)
+        return template.format(lookup_value)
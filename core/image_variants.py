@@ -0,0 +1,186 @@
+"""
+Resized variants (thumb, card, full) of uploaded images.
+
+Variants are rendered with Pillow in a process pool after the saving
+transaction commits, so upload requests never wait for the resize work.
+They are stored next to the original as '<dir>/variants/<name>_<variant><ext>'.
+Once all variants are written, the owning model is told through an `on_ready`
+callback and records that in a '<field>_variants_ready' flag; until then the
+variant URLs fall back to the original image.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGE_VARIANTS = {
+    'thumb': (160, 160),
+    'card': (480, 360),
+    'full': (1600, 1600),
+}
+
+_executor = None
+
+
+def get_variant_sizes():
+    return getattr(settings, 'IMAGE_VARIANTS', DEFAULT_IMAGE_VARIANTS)
+
+
+def get_variant_name(name, variant):
+    """
+    Returns the storage name of one variant, e.g.
+    'offer_images/logo.png' -> 'offer_images/variants/logo_thumb.png'.
+    """
+    directory, filename = os.path.split(name)
+    base, extension = os.path.splitext(filename)
+    return os.path.join(directory, 'variants', f'{base}_{variant}{extension}')
+
+
+def get_variant_names(name):
+    return [get_variant_name(name, variant) for variant in get_variant_sizes()]
+
+
+def render_variants(source_path, targets):
+    """
+    Writes every (target_path, (width, height)) variant of the image at
+    source_path, keeping the aspect ratio and never upscaling. Runs in a worker
+    process, so it only works with absolute paths and does not touch Django.
+    Each file is written to a temporary name first and then moved into place.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as source:
+        image_format = source.format
+        image = ImageOps.exif_transpose(source)
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        for target_path, size in targets:
+            variant = image.copy()
+            variant.thumbnail(size)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            temporary_path = f'{target_path}.tmp'
+            save_options = {'optimize': True}
+            if image_format in ('JPEG', 'WEBP'):
+                save_options['quality'] = 85
+            variant.save(temporary_path, format=image_format, **save_options)
+            os.replace(temporary_path, target_path)
+    return [target_path for target_path, _ in targets]
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def wait_for_pending():
+    """Blocks until all queued variant renders are finished."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def _notify_ready(name, on_ready):
+    if on_ready is None:
+        return
+    try:
+        on_ready(name)
+    except Exception as exc:
+        logger.error("Error recording image variants of %s as ready: %s", name, exc)
+
+
+def _finish_render(name, on_ready):
+    """
+    Returns the done callback of a pooled render. It runs in a thread of the
+    parent process, so it can use the ORM; its connection is closed again
+    because that thread is not managed by Django's request cycle.
+    """
+    def callback(future):
+        exception = future.exception()
+        if exception is not None:
+            logger.error("Error generating image variants for %s: %s", name, exception)
+            return
+        try:
+            _notify_ready(name, on_ready)
+        finally:
+            connection.close()
+    return callback
+
+
+def generate_variants(name, on_ready=None):
+    """
+    Renders all variants of the stored image `name`, in the process pool or,
+    with IMAGE_VARIANT_WORKERS = 0, in the calling thread, and then calls
+    `on_ready(name)`.
+    """
+    source_path = default_storage.path(name)
+    targets = [
+        (default_storage.path(get_variant_name(name, variant)), tuple(size))
+        for variant, size in get_variant_sizes().items()
+    ]
+    if not settings.IMAGE_VARIANT_WORKERS:
+        try:
+            render_variants(source_path, targets)
+        except Exception as exc:
+            logger.error("Error generating image variants for %s: %s", name, exc)
+            return
+        _notify_ready(name, on_ready)
+        return
+    get_executor().submit(render_variants, source_path, targets).add_done_callback(_finish_render(name, on_ready))
+
+
+def schedule_variants(name, on_ready=None):
+    """
+    Queues variant generation for the stored image `name` once the current
+    transaction commits.
+    """
+    if name:
+        transaction.on_commit(lambda: generate_variants(name, on_ready))
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only field exposing the variant URLs of an image field as
+    {'thumb': url, 'card': url, 'full': url}, or None without an image.
+    Until the model's `ready_source` flag (by default '<source>_variants_ready')
+    is set, all variants point at the original.
+    """
+
+    def __init__(self, ready_source=None, **kwargs):
+        kwargs['read_only'] = True
+        self.ready_source = ready_source
+        super().__init__(**kwargs)
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        if self.ready_source is None:
+            self.ready_source = f'{self.source}_variants_ready'
+
+    @property
+    def projected_columns(self):
+        """Model columns read besides the source, see FieldProjectionMixin."""
+        return (self.ready_source,)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        ready = getattr(value.instance, self.ready_source, False)
+        urls = {}
+        for variant in get_variant_sizes():
+            url = default_storage.url(get_variant_name(value.name, variant)) if ready else value.url
+            urls[variant] = request.build_absolute_uri(url) if request is not None else url
+        return urls
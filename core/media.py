@@ -0,0 +1,74 @@
+"""
+Deferred deletion of uploaded media files.
+
+Models queue the names of files they no longer reference with
+`delete_on_commit()`. Nothing is removed if the transaction rolls back, and
+after a commit the files (and their resized variants) are removed by a
+background thread, so requests never wait on the filesystem. Files that are
+leaked anyway, e.g. uploads of rolled back saves, are reclaimed by the
+`collect_orphan_media` management command.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .image_variants import get_variant_names
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.MEDIA_DELETION_WORKERS,
+            thread_name_prefix='media-deletion'
+        )
+    return _executor
+
+
+def delete_files(names):
+    """
+    Removes the stored files `names` together with their image variants.
+    Missing files are ignored; other errors are logged, never raised.
+    """
+    deleted = 0
+    for name in names:
+        for file_name in [name, *get_variant_names(name)]:
+            try:
+                if default_storage.exists(file_name):
+                    default_storage.delete(file_name)
+                    deleted += 1
+            except OSError as exc:
+                logger.error("Error deleting media file %s: %s", file_name, exc)
+    return deleted
+
+
+def _submit(names):
+    if not settings.MEDIA_DELETION_WORKERS:
+        delete_files(names)
+        return
+    get_executor().submit(delete_files, names)
+
+
+def delete_on_commit(*names):
+    """
+    Queues the stored files `names` for deletion once the current transaction
+    commits. Empty names are skipped.
+    """
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: _submit(names))
+
+
+def wait_for_pending():
+    """Blocks until all queued deletions are finished."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.datastructures import MultiValueDict
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to a retrieve view's GET.
+
+    Subclasses implement `get_validator_values()`, which should fetch the few
+    columns describing the current version of the object with a single indexed
+    query and return `(values, last_modified)` or None if the object does not
+    exist. Requests whose If-None-Match / If-Modified-Since still match are
+    answered with 304 Not Modified before the object is loaded and serialized.
+    """
+
+    def get_validator_values(self):
+        raise NotImplementedError('Subclasses must implement get_validator_values().')
+
+    def get_etag(self, values):
+        """
+        Hashes the validator values together with everything else the rendered
+        body depends on: absolute URLs use the host, and the renderer decides
+        the format.
+        """
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        raw = repr((
+            self.request.get_host(),
+            self.request.scheme,
+            getattr(renderer, 'format', None),
+            values,
+        ))
+        return quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validator_values()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        values, last_modified = validators
+        etag = self.get_etag(values)
+        last_modified_timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_timestamp
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        if last_modified_timestamp is not None:
+            response['Last-Modified'] = http_date(last_modified_timestamp)
+        return response
+
+
+def _canonical_request_data(value):
+    """
+    Converts parsed request data (JSON, form fields and uploaded files) into
+    a JSON-serializable structure that does not depend on key order.
+    """
+    if isinstance(value, MultiValueDict):
+        return sorted(
+            ([key, [_canonical_request_data(item) for item in value.getlist(key)]] for key in value),
+            key=lambda item: item[0]
+        )
+    if isinstance(value, dict):
+        return sorted(
+            ([str(key), _canonical_request_data(item)] for key, item in value.items()),
+            key=lambda item: item[0]
+        )
+    if isinstance(value, (list, tuple)):
+        return [_canonical_request_data(item) for item in value]
+    if isinstance(value, UploadedFile):
+        digest = hashlib.sha256()
+        for chunk in value.chunks():
+            digest.update(chunk)
+        value.seek(0)
+        return ['file', value.name, value.size, digest.hexdigest()]
+    return value
+
+
+class IdempotentCreateMixin:
+    """
+    Makes a create view's POST idempotent for clients sending an
+    'Idempotency-Key' header.
+
+    The first request with a key claims it by inserting an IdempotencyKey row
+    (unique per user and key) and stores its response there once it is done.
+    Retries with the same key and payload get that response replayed, marked
+    with 'Idempotent-Replayed: true', without validating or inserting again.
+    A retry arriving while the first request is still running waits for it
+    (up to IDEMPOTENCY_WAIT_TIMEOUT seconds, then 409). Reusing a key for a
+    different payload is rejected with 422. Requests that fail with an error
+    release their key, so they can be retried. Keys expire after
+    IDEMPOTENCY_KEY_TTL seconds and are removed by `purge_idempotency_keys`.
+    """
+    idempotency_header = 'Idempotency-Key'
+    idempotency_poll_interval = 0.05
+
+    def get_request_fingerprint(self, request):
+        raw = json.dumps(
+            [request.method, request.path, _canonical_request_data(request.data)],
+            default=str, separators=(',', ':')
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if key is None:
+            return super().post(request, *args, **kwargs)
+        if not key or len(key) > 255:
+            return Response(
+                {'error': f'{self.idempotency_header} must be between 1 and 255 characters long.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = self.get_request_fingerprint(request)
+        record = self.claim_idempotency_key(request.user, key, fingerprint)
+        if isinstance(record, Response):
+            return record
+
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+            return response
+
+        # Store the body as the JSON renderer outputs it, so a replay renders
+        # exactly the same content.
+        body = json.loads(JSONRenderer().render(response.data) or 'null')
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status_code=response.status_code, response_body=body
+        )
+        return response
+
+    def claim_idempotency_key(self, user, key, fingerprint):
+        """
+        Returns the newly inserted IdempotencyKey if this request is the first
+        one with `key`, otherwise the Response to answer the request with.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            now = timezone.now()
+            try:
+                with transaction.atomic():
+                    return IdempotencyKey.objects.create(
+                        user=user,
+                        key=key,
+                        request_fingerprint=fingerprint,
+                        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+                    )
+            except IntegrityError:
+                pass
+
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is None:
+                continue
+            abandoned = (
+                record.status_code is None
+                and record.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+            )
+            if record.expires_at <= now or abandoned:
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+                continue
+            if record.request_fingerprint != fingerprint:
+                return Response(
+                    {'error': f'This {self.idempotency_header} was already used for a different request.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if record.status_code is not None:
+                return Response(
+                    record.response_body,
+                    status=record.status_code,
+                    headers={'Idempotent-Replayed': 'true'}
+                )
+            if time.monotonic() >= deadline:
+                return Response(
+                    {'error': f'A request with this {self.idempotency_header} is still being processed.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            time.sleep(self.idempotency_poll_interval)
+
+
+class DynamicFieldsSerializerMixin:
+    """
+    Lets a serializer be created with `fields=[...]` to output only a subset
+    of its fields, in its declared order.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class FieldProjectionMixin:
+    """
+    Adds a '?fields=a,b' projection to a list view whose serializer uses
+    DynamicFieldsSerializerMixin: only the requested fields are serialized,
+    and `project_queryset()` loads only the model columns the remaining
+    serializer fields read (their `source`), with `.only()`; annotations
+    need no column. Unknown field names are rejected with 400.
+    """
+    fields_query_param = 'fields'
+
+    def get_requested_fields(self):
+        raw_fields = self.request.query_params.get(self.fields_query_param, '')
+        requested = [name.strip() for name in raw_fields.split(',') if name.strip()]
+        return list(dict.fromkeys(requested)) or None
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        requested = self.get_requested_fields()
+        if requested:
+            available = self.get_serializer_class().Meta.fields
+            unknown = [name for name in requested if name not in available]
+            if unknown:
+                return Response(
+                    {'error': f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(available)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return super().list(request, *args, **kwargs)
+
+    def project_queryset(self, queryset):
+        """
+        Restricts `queryset` to the columns read by the serializer fields that
+        will be output, plus the relations they are read through. Falls back
+        to the unrestricted queryset if a field reads anything but model
+        fields (e.g. a property), which .only() would defer into extra queries.
+        """
+        columns = {'pk'}
+        for field in self.get_serializer().fields.values():
+            if field.source == '*':
+                return queryset
+            model = queryset.model
+            path = []
+            for attribute in field.source_attrs:
+                if model is queryset.model and not path and attribute in queryset.query.annotations:
+                    break
+                try:
+                    model_field = model._meta.get_field(attribute)
+                except FieldDoesNotExist:
+                    if attribute == 'pk':
+                        break
+                    return queryset
+                path.append(attribute)
+                if model_field.is_relation:
+                    columns.add('__'.join(path))
+                    model = model_field.related_model
+            if path:
+                columns.add('__'.join(path))
+            # Sibling columns a field reads from the instance owning its source.
+            columns.update('__'.join([*path[:-1], column]) for column in getattr(field, 'projected_columns', ()))
+        return queryset.only(*columns)
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stores the first response to a POST sent with an 'Idempotency-Key'
+    header, per user and key, so retries of the same request get the same
+    response instead of creating another row (see IdempotentCreateMixin).
+    A row without a status code marks a request that is still in flight.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name=_("User")
+    )
+    key = models.CharField(_("Key"), max_length=255)
+    request_fingerprint = models.CharField(_("Request Fingerprint"), max_length=64)
+    status_code = models.PositiveSmallIntegerField(_("Status Code"), null=True, blank=True)
+    response_body = models.JSONField(_("Response Body"), null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(_("Expires At"), db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} of user {self.user_id}"
@@ -0,0 +1,224 @@
+import base64
+import binascii
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks to the next page using the values of the
+    active ordering of the last returned row, with the primary key appended
+    as a tiebreaker. It runs no COUNT query and, given an index matching the
+    ordering, costs the same on page 1 as on page 1000.
+
+    The active ordering is read from the queryset (as set by ordering filter
+    backends), falling back to the model's Meta.ordering and then to
+    `default_ordering`. Only plain field or annotation names are supported.
+    NULL values are treated as the lowest values, as SQLite orders them.
+    Only forward ('next') links are provided.
+
+    A `union()` queryset is paginated branch by branch: every branch gets the
+    position filter, the ordering and the page limit on its own, so each one
+    can be served by its own index, and the branch pages are merged in the
+    ordering (dropping duplicates) before the page is cut.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 6
+    page_size_query_param = None
+    max_page_size = None
+    default_ordering = ('-pk',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.ordering_keys = [self.get_ordering_key(queryset, field) for field in self.ordering]
+
+        position = self.decode_cursor(request)
+        if getattr(queryset.query, 'combinator', None):
+            results = self.get_union_results(queryset, position)
+        else:
+            results = list(self.get_branch_page(queryset, position))
+
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_branch_page(self, queryset, position):
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        return queryset[:self.page_size + 1]
+
+    def get_union_results(self, queryset, position):
+        if queryset.query.combinator != 'union':
+            raise ValueError('Keyset pagination only supports union() of querysets.')
+        rows = {}
+        for branch_query in queryset.query.combined_queries:
+            branch = queryset.model._default_manager.all()
+            branch.query = branch_query.clone()
+            if queryset._prefetch_related_lookups:
+                branch = branch.prefetch_related(*queryset._prefetch_related_lookups)
+            for row in self.get_branch_page(branch, position):
+                rows.setdefault(row.pk, row)
+
+        results = list(rows.values())
+        # Stable sorts from the last key to the first give the combined ordering;
+        # (is not None, value) puts NULLs lowest.
+        for name, descending, _ in reversed(self.ordering_keys):
+            results.sort(
+                key=lambda row: (getattr(row, name) is not None, getattr(row, name)),
+                reverse=descending
+            )
+        return results[:self.page_size + 1]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+                if page_size > 0:
+                    if self.max_page_size:
+                        return min(page_size, self.max_page_size)
+                    return page_size
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Returns the active ordering as a list of field names with the primary key
+        appended in the direction of the leading field.
+        """
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        if not ordering:
+            ordering = list(queryset.model._meta.ordering or self.default_ordering)
+
+        pk_name = queryset.model._meta.pk.name
+        if not any(field.lstrip('-') in ('pk', pk_name) for field in ordering):
+            ordering.append(f'-{pk_name}' if ordering[0].startswith('-') else pk_name)
+        return ordering
+
+    def get_ordering_key(self, queryset, field):
+        """
+        Returns (name, descending, model_field) for one ordering entry. The
+        model field (or the annotation's output field) is used to decode cursor
+        values and to know whether NULLs have to be considered.
+        """
+        descending = field.startswith('-')
+        name = field.lstrip('-')
+        if name == 'pk':
+            name = queryset.model._meta.pk.name
+        if name in queryset.query.annotations:
+            return name, descending, queryset.query.annotations[name].output_field
+        try:
+            return name, descending, queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError(f"Keyset pagination cannot order by '{field}'.")
+
+    def get_position_filter(self, position):
+        """
+        Builds the WHERE clause selecting all rows strictly after `position`:
+        (a > x) OR (a = x AND b > y) OR ... with a leading range bound on the
+        first ordering field so the database can seek on its index.
+        """
+        position_filter = None
+        equal_so_far = Q()
+        for (name, descending, field), value in zip(self.ordering_keys, position):
+            after = self.get_after_filter(name, descending, field, value)
+            if after is not None:
+                term = equal_so_far & after
+                position_filter = term if position_filter is None else position_filter | term
+            if value is None:
+                equal_so_far &= Q(**{f'{name}__isnull': True})
+            else:
+                equal_so_far &= Q(**{name: value})
+
+        if position_filter is None:
+            position_filter = Q(pk__in=[])
+
+        name, descending, field = self.ordering_keys[0]
+        value = position[0]
+        if value is not None:
+            if descending:
+                bound = Q(**{f'{name}__lte': value})
+                if field.null:
+                    bound |= Q(**{f'{name}__isnull': True})
+            else:
+                bound = Q(**{f'{name}__gte': value})
+            position_filter = bound & position_filter
+        return position_filter
+
+    def get_after_filter(self, name, descending, field, value):
+        if descending:
+            if value is None:
+                return None
+            after = Q(**{f'{name}__lt': value})
+            if field.null:
+                after |= Q(**{f'{name}__isnull': True})
+            return after
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        return Q(**{f'{name}__gt': value})
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last_row = self.page[-1]
+        position = [getattr(last_row, name) for name, _, _ in self.ordering_keys]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position))
+
+    def encode_cursor(self, position):
+        values = []
+        for value in position:
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            values.append(value)
+        payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def decode_cursor(self, request):
+        """
+        Returns the decoded position list, or None for the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.ordering_keys):
+                raise ValueError
+            return [
+                None if value is None else field.to_python(value)
+                for (_, _, field), value in zip(self.ordering_keys, values)
+            ]
+        except (TypeError, ValueError, UnicodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
@@ -51,8 +51,8 @@ INSTALLED_APPS = [
     'offers_app',
     'orders_app',
     'reviews_app',
-    'base_info_app'
-    
+    'base_info_app',
+    'core',
 ]
 
 AUTH_USER_MODEL = 'user_auth_app.CustomUser'
@@ -162,6 +162,51 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Caching
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a shared backend (e.g. Redis or Memcached) when running several processes,
+# otherwise cache invalidation only reaches the process that performed the write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+OFFER_LIST_CACHE_TIMEOUT = 300
+
+# Resized image variants (see core/image_variants.py), rendered in a process pool
+# with IMAGE_VARIANT_WORKERS workers; 0 renders them in the request thread.
+
+IMAGE_VARIANTS = {
+    'thumb': (160, 160),
+    'card': (480, 360),
+    'full': (1600, 1600),
+}
+
+IMAGE_VARIANT_WORKERS = 2
+
+# Background threads removing media files of deleted or replaced images after
+# the transaction commits (see core/media.py); 0 removes them inline.
+
+MEDIA_DELETION_WORKERS = 1
+
+# Idempotency-Key handling for POST /api/orders/ and /api/offers/ (see core/mixins.py):
+# how long stored responses are replayed, how long a duplicate waits for the
+# first request, and after how long an unfinished first request counts as abandoned.
+
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Platform statistics of /api/base-info/ (see base_info_app/stats.py): snapshots older
+# than this many seconds are recomputed in the background by BASE_INFO_STATS_WORKERS
+# threads (0 recomputes them in the request thread).
+
+BASE_INFO_STATS_REFRESH_INTERVAL = 300
+BASE_INFO_STATS_WORKERS = 1
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
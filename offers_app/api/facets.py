@@ -0,0 +1,67 @@
+from django.db.models import Case, Count, IntegerField, Value, When
+
+# Thresholds offered as values of the 'min_price' and 'max_delivery_time' filters.
+PRICE_BUCKETS = (50, 100, 250, 500, 1000)
+DELIVERY_TIME_BUCKETS = (1, 3, 7, 14, 30)
+
+
+def bucket_expression(field_name, thresholds):
+    """
+    Maps a column to the index of the first threshold it does not exceed,
+    or NULL if it exceeds all of them (or is NULL itself).
+    """
+    return Case(
+        *[When(**{f'{field_name}__lte': threshold}, then=Value(index)) for index, threshold in enumerate(thresholds)],
+        default=None,
+        output_field=IntegerField()
+    )
+
+
+def cumulative_counts(bucket_counts, thresholds):
+    """
+    Turns per-bucket counts into the number of offers each filter value would
+    return, since 'min_price' and 'max_delivery_time' filter with <=.
+    """
+    facet, total = [], 0
+    for index, threshold in enumerate(thresholds):
+        total += bucket_counts.get(index, 0)
+        facet.append({'value': threshold, 'count': total})
+    return facet
+
+
+def get_offer_facets(queryset):
+    """
+    Counts the offers of an already filtered and searched queryset per
+    category, per min_price bucket and per max_delivery_time bucket.
+
+    All three facets come from a single query grouped by category and both
+    buckets; the per-facet counts are summed up from its rows.
+    """
+    rows = (
+        queryset.order_by().prefetch_related(None)
+        .values(
+            'category_id', 'category__name',
+            price_bucket=bucket_expression('min_price', PRICE_BUCKETS),
+            delivery_bucket=bucket_expression('min_delivery_time', DELIVERY_TIME_BUCKETS),
+        )
+        .annotate(count=Count('id'))
+    )
+
+    categories, price_counts, delivery_counts = {}, {}, {}
+    for row in rows:
+        count = row['count']
+        if row['category_id'] is not None:
+            category = categories.setdefault(
+                row['category_id'], {'id': row['category_id'], 'name': row['category__name'], 'count': 0}
+            )
+            category['count'] += count
+        if row['price_bucket'] is not None:
+            price_counts[row['price_bucket']] = price_counts.get(row['price_bucket'], 0) + count
+        if row['delivery_bucket'] is not None:
+            delivery_counts[row['delivery_bucket']] = delivery_counts.get(row['delivery_bucket'], 0) + count
+
+    return {
+        'category_id': sorted(categories.values(), key=lambda category: (-category['count'], category['name'])),
+        'min_price': cumulative_counts(price_counts, PRICE_BUCKETS),
+        'max_delivery_time': cumulative_counts(delivery_counts, DELIVERY_TIME_BUCKETS),
+    }
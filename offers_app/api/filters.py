@@ -1,31 +1,123 @@
+import re
 from django_filters import rest_framework as filters
-from rest_framework.filters import BaseFilterBackend
-from ..models import Offer
+from django_filters.constants import EMPTY_VALUES
+from django.db import connections
+from django.db.models import Exists, FloatField, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+from ..models import Offer, OfferDetail
+
+class DetailPredicateMixin:
+    """
+    Marks a filter as a predicate on the offer's details, applied as a
+    correlated EXISTS subquery instead of a join, so the offer rows are never
+    duplicated and no DISTINCT is needed. OfferFilter combines all detail
+    predicates of a request into one EXISTS, so they have to hold for the
+    same detail.
+    """
+
+    def get_detail_q(self, value):
+        if value in EMPTY_VALUES:
+            return None
+        return Q(**{f'{self.field_name}__{self.lookup_expr}': value})
+
+    def filter(self, qs, value):
+        detail_q = self.get_detail_q(value)
+        if detail_q is None:
+            return qs
+        return qs.filter(Exists(OfferDetail.objects.filter(detail_q, offer=OuterRef('pk'))))
+
+class OfferDetailNumberFilter(DetailPredicateMixin, filters.NumberFilter):
+    pass
+
+class OfferDetailChoiceFilter(DetailPredicateMixin, filters.ChoiceFilter):
+    pass
 
 class OfferFilter(filters.FilterSet):
     """
     Filters for the Offer list endpoint.
 
     Allows filtering by category_id, creator_id (user__id),
-    min_offer_price (details__price__gte), max_offer_price (details__price__lte),
-    and max_delivery_time (details__delivery_time_in_days__lte).
+    min_price (min_price__lte) and max_delivery_time (min_delivery_time__lte),
+    reading the denormalized summary columns on Offer, and by the detail
+    predicates offer_type and min_revisions, which have to match the same
+    detail and are applied as one EXISTS subquery (see DetailPredicateMixin).
     """
     category_id = filters.NumberFilter(field_name='category__id')
     creator_id = filters.NumberFilter(field_name='user__id')
-    min_price = filters.NumberFilter(method='filter_by_annotated_min_price')
-    max_delivery_time = filters.NumberFilter(field_name='details__delivery_time_in_days', lookup_expr='lte')
+    min_price = filters.NumberFilter(field_name='min_price', lookup_expr='lte')
+    max_delivery_time = filters.NumberFilter(field_name='min_delivery_time', lookup_expr='lte')
+    offer_type = OfferDetailChoiceFilter(field_name='offer_type', choices=OfferDetail.OFFER_TYPE_CHOICES)
+    min_revisions = OfferDetailNumberFilter(field_name='revisions', lookup_expr='gte')
 
     class Meta:
         model = Offer
         fields = ['creator_id', 'category_id', 'max_delivery_time']
-        
-    def filter_by_annotated_min_price(self, queryset, name, value):
-         return queryset.filter(min_price_annotated__lte=value)
+
+    def filter_queryset(self, queryset):
+        detail_q = Q()
+        for name, value in self.form.cleaned_data.items():
+            offer_filter = self.filters[name]
+            if isinstance(offer_filter, DetailPredicateMixin):
+                q = offer_filter.get_detail_q(value)
+                if q is not None:
+                    detail_q &= q
+                continue
+            queryset = offer_filter.filter(queryset, value)
+        if detail_q:
+            queryset = queryset.filter(
+                Exists(OfferDetail.objects.filter(detail_q, offer=OuterRef('pk')))
+            )
+        return queryset
+
+class OfferFullTextSearchFilter(SearchFilter):
+    """
+    Full-text search for the 'search' parameter backed by the SQLite FTS5 table
+    'offers_app_offer_fts', which indexes offer title, description and the
+    detail titles/features and is kept in sync by database triggers.
+    Matching offers are annotated with their BM25 rank as 'search_rank'.
+    Falls back to the regular SearchFilter on other database backends.
+    """
+    fts_table = 'offers_app_offer_fts'
+    rank_weights = (10.0, 5.0, 1.0)
+
+    def get_match_expression(self, request):
+        """
+        Builds an FTS5 MATCH expression from the search terms. Every word is
+        quoted and prefix-matched so partially typed terms still find offers.
+        """
+        words = re.findall(r'\w+', ' '.join(self.get_search_terms(request)))
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'sqlite':
+            return super().filter_queryset(request, queryset, view)
+
+        match_expression = self.get_match_expression(request)
+        if not match_expression:
+            return queryset
+
+        offer_table = queryset.model._meta.db_table
+        weights = ', '.join(str(weight) for weight in self.rank_weights)
+        matching_ids = RawSQL(
+            f"SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s", (match_expression,)
+        )
+        # bm25() needs a MATCH in its own query; the rowid constraint lets
+        # FTS5 seek to the offer instead of scanning the whole match.
+        search_rank = RawSQL(
+            f"SELECT bm25({self.fts_table}, {weights}) FROM {self.fts_table} "
+            f"WHERE {self.fts_table} MATCH %s AND rowid = {offer_table}.id",
+            (match_expression,),
+            output_field=FloatField()
+        )
+        return queryset.filter(id__in=matching_ids).annotate(search_rank=search_rank)
+
 class CustomOfferOrderingFilter(BaseFilterBackend):
     """
     Custom ordering filter to handle 'min_price' and '-min_price' parameters
-    by sorting on the 'min_price_annotated' or 'max_price_annotated' fields respectively.
-    Handles 'updated_at' as well.
+    by sorting on the denormalized 'min_price' column of Offer.
+    Handles 'updated_at' as well. Search results without an explicit
+    ordering are sorted by their full-text 'search_rank'.
     """
     ordering_param = 'ordering'
     default_ordering = '-updated_at'
@@ -33,8 +125,6 @@ class CustomOfferOrderingFilter(BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
         """
         Applies ordering based on the 'ordering' query parameter.
-        The queryset is expected to be annotated with 'min_price_annotated' and 'max_price_annotated'
-        by the view's get_queryset method.
         """
         ordering_param_value = request.query_params.get(self.ordering_param)
         final_ordering_fields = []
@@ -43,14 +133,17 @@ class CustomOfferOrderingFilter(BaseFilterBackend):
             orderings = [param.strip() for param in ordering_param_value.split(',')]
             for field in orderings:
                 if field == 'min_price':
-                    final_ordering_fields.append('min_price_annotated')
+                    final_ordering_fields.append('min_price')
                 elif field == '-min_price':
-                    final_ordering_fields.append('-min_price_annotated')
+                    final_ordering_fields.append('-min_price')
                 elif field == 'updated_at':
                     final_ordering_fields.append('updated_at')
                 elif field == '-updated_at':
                     final_ordering_fields.append('-updated_at')
 
+        if not final_ordering_fields and 'search_rank' in queryset.query.annotations:
+            final_ordering_fields = ['search_rank', self.default_ordering]
+
         if not final_ordering_fields:
             default = self.default_ordering
             if isinstance(default, str):
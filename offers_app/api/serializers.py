@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from django.db.models import Min, Max
+from django.db import transaction
+from core.fields import TemplatedHyperlinkedIdentityField
+from core.image_variants import ImageVariantsField
+from .. import cache as offer_list_cache
 from ..models import Offer, OfferDetail, Category
 
 CustomUser = get_user_model()
@@ -31,7 +34,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return representation
 
 class SimpleOfferDetailSerializer(serializers.ModelSerializer):
-    url = serializers.HyperlinkedIdentityField(
+    url = TemplatedHyperlinkedIdentityField(
          view_name='offers_api:offerdetail-detail',
          lookup_field='id'
      )
@@ -84,30 +87,20 @@ class OfferDetailUpdateSerializer(serializers.ModelSerializer):
 class OfferListSerializer(serializers.ModelSerializer):
     user = serializers.IntegerField(source='user.id', read_only=True)
     details = SimpleOfferDetailSerializer(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True, coerce_to_string=False)
+    min_delivery_time = serializers.IntegerField(read_only=True)
     user_details = OfferListUserDetailsSerializer(source='user', read_only=True)
     image = serializers.ImageField(read_only=True, allow_null=True)
+    image_variants = ImageVariantsField(source='image')
     description = serializers.CharField(read_only=True, allow_blank=True, allow_null=True)
 
     class Meta:
         model = Offer
         fields = (
-            'id', 'user', 'title', 'image', 'description', 'created_at', 'updated_at',
+            'id', 'user', 'title', 'image', 'image_variants', 'description', 'created_at', 'updated_at',
             'details', 'min_price', 'min_delivery_time', 'user_details'
         )
 
-    def get_min_price(self, obj):
-        if obj.details.exists():
-            min_data = obj.details.aggregate(min_p=Min('price'))
-            return min_data.get('min_p')
-        return None
-    def get_min_delivery_time(self, obj):
-        if obj.details.exists():
-            min_data = obj.details.aggregate(min_dt=Min('delivery_time_in_days'))
-            return min_data.get('min_dt')
-        return None
-
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         fields_to_empty_string_if_null = ['image', 'description']
@@ -137,11 +130,33 @@ class OfferCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         details_data = validated_data.pop('details')
         user = self.context['request'].user
-        offer = Offer.objects.create(user=user, **validated_data)
-        for detail_data in details_data:
-            OfferDetail.objects.create(offer=offer, **detail_data)
+        with transaction.atomic():
+            offer = Offer.objects.create(user=user, **validated_data)
+            OfferDetail.objects.bulk_create(
+                [OfferDetail(offer=offer, **detail_data) for detail_data in details_data]
+            )
+            offer.refresh_detail_summary()
         return offer
 
+class OfferImportSerializer(serializers.ModelSerializer):
+    """
+    Validates a single offer of a bulk import (see offers_app.importer).
+    The category is checked against the set of known category ids passed as
+    'category_ids' in the context instead of running one query per item.
+    """
+    details = OfferDetailCreateSerializer(many=True, allow_empty=False)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    description = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = Offer
+        fields = ('title', 'description', 'category', 'details')
+
+    def validate_category(self, value):
+        if value is not None and value not in self.context['category_ids']:
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return value
+
 class OfferResponseSerializer(serializers.ModelSerializer):
      details = OfferDetailSpecificSerializer(many=True, read_only=True)
      image = serializers.ImageField(read_only=True, allow_null=True)
@@ -165,30 +180,20 @@ class OfferResponseSerializer(serializers.ModelSerializer):
 class OfferRetrieveSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     details = SimpleOfferDetailSerializer(many=True, read_only=True)
-    min_price = serializers.SerializerMethodField()
-    min_delivery_time = serializers.SerializerMethodField()
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True, coerce_to_string=False)
+    min_delivery_time = serializers.IntegerField(read_only=True)
     image = serializers.ImageField(read_only=True, allow_null=True)
+    image_variants = ImageVariantsField(source='image')
     category = CategorySerializer(read_only=True, allow_null=True)
     description = serializers.CharField(read_only=True, allow_blank=True, allow_null=True)
 
     class Meta:
         model = Offer
         fields = (
-            'id', 'user', 'title', 'image', 'description', 'category', 'created_at', 'updated_at',
+            'id', 'user', 'title', 'image', 'image_variants', 'description', 'category', 'created_at', 'updated_at',
             'details', 'min_price', 'min_delivery_time',
         )
 
-    def get_min_price(self, obj):
-        if obj.details.exists():
-            min_data = obj.details.aggregate(min_p=Min('price'))
-            return min_data.get('min_p')
-        return None
-    def get_min_delivery_time(self, obj):
-        if obj.details.exists():
-            min_data = obj.details.aggregate(min_dt=Min('delivery_time_in_days'))
-            return min_data.get('min_dt')
-        return None
-
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         fields_to_empty_string_if_null = ['image', 'description']
@@ -218,31 +223,60 @@ class OfferUpdateSerializer(serializers.ModelSerializer):
         fields = ('title', 'image', 'description', 'category', 'details')
 
     def update(self, instance, validated_data):
+        """
+        Writes only what actually changed: the offer row is saved with the
+        changed fields only (and not at all if none changed), and the details
+        are diffed against the existing ones by offer_type and written with a
+        single bulk_update, all inside one transaction.
+        """
         details_data = validated_data.pop('details', None)
-
-        instance.title = validated_data.get('title', instance.title)
-        instance.description = validated_data.get('description', instance.description)
-        instance.category = validated_data.get('category', instance.category)
-        if 'image' in validated_data:
-            instance.image = validated_data.get('image')
-        instance.save()
-
-        if details_data is not None:
-            existing_details_map = {detail.offer_type: detail for detail in instance.details.all()}
-
-            for detail_data_item in details_data:
-                item_offer_type = detail_data_item.get('offer_type')
-                if not item_offer_type:
-                    continue
-
-                detail_instance = existing_details_map.get(item_offer_type)
-
-                if detail_instance:
-                    update_payload = {k: v for k, v in detail_data_item.items() if k != 'offer_type'}
-
-                    detail_serializer = OfferDetailUpdateSerializer(
-                        instance=detail_instance, data=update_payload, partial=True
+        changed_fields = self.apply_offer_changes(instance, validated_data)
+
+        with transaction.atomic():
+            if changed_fields:
+                instance.save(update_fields=changed_fields + ['updated_at'])
+
+            if details_data:
+                changed_details, changed_detail_fields = self.apply_detail_changes(instance, details_data)
+                if changed_details:
+                    OfferDetail.objects.bulk_update(changed_details, changed_detail_fields)
+                    # bulk_update sends no signals, so keep the summary and the
+                    # cached offer lists in sync here.
+                    instance.refresh_detail_summary()
+                    offer_list_cache.bump_generations(
+                        user_ids=[instance.user_id], category_ids=[instance.category_id]
                     )
-                    if detail_serializer.is_valid(raise_exception=True):
-                        detail_serializer.save()
         return instance
+
+    def apply_offer_changes(self, instance, validated_data):
+        changed_fields = []
+        for field_name in ('title', 'description'):
+            if field_name in validated_data and getattr(instance, field_name) != validated_data[field_name]:
+                setattr(instance, field_name, validated_data[field_name])
+                changed_fields.append(field_name)
+        if 'category' in validated_data:
+            category = validated_data['category']
+            if instance.category_id != (category.pk if category else None):
+                instance.category = category
+                changed_fields.append('category')
+        if 'image' in validated_data:
+            image = validated_data['image']
+            if image is not None or instance.image:
+                instance.image = image
+                changed_fields.append('image')
+        return changed_fields
+
+    def apply_detail_changes(self, instance, details_data):
+        existing_details_map = {detail.offer_type: detail for detail in instance.details.all()}
+        changed_details = {}
+        changed_fields = set()
+        for detail_data_item in details_data:
+            detail_instance = existing_details_map.get(detail_data_item.get('offer_type'))
+            if detail_instance is None:
+                continue
+            for field_name, value in detail_data_item.items():
+                if field_name != 'offer_type' and getattr(detail_instance, field_name) != value:
+                    setattr(detail_instance, field_name, value)
+                    changed_fields.add(field_name)
+                    changed_details[detail_instance.pk] = detail_instance
+        return list(changed_details.values()), sorted(changed_fields)
@@ -2,13 +2,17 @@ from django.urls import path
 from .views import (
     OfferListCreateView,
     OfferRetrieveUpdateDestroyView,
-    OfferDetailSpecificView
+    OfferDetailSpecificView,
+    OfferListCacheStatsView,
+    OfferBulkImportView
 )
 
 app_name = 'offers_api'
 
 urlpatterns = [
     path('offers/', OfferListCreateView.as_view(), name='offer-list-create'),
+    path('offers/import/', OfferBulkImportView.as_view(), name='offer-bulk-import'),
+    path('offers/cache-stats/', OfferListCacheStatsView.as_view(), name='offer-list-cache-stats'),
     path('offers/<int:id>/', OfferRetrieveUpdateDestroyView.as_view(), name='offer-detail'),
     path('offerdetails/<int:id>/', OfferDetailSpecificView.as_view(), name='offerdetail-detail'),
 ]
\ No newline at end of file
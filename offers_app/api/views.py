@@ -1,12 +1,13 @@
-from rest_framework import generics, filters, status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework import generics, status, views
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Min, Max, Value, DecimalField
-from django.db.models.functions import Coalesce
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from decimal import Decimal
+from core.mixins import ConditionalGetMixin, IdempotentCreateMixin
+from core.pagination import KeysetPagination
+from .. import cache as offer_list_cache
+from ..importer import OfferImporter
 from ..models import Offer, OfferDetail
 from .serializers import (
     OfferListSerializer,
@@ -16,8 +17,10 @@ from .serializers import (
     OfferResponseSerializer,
     OfferDetailSpecificSerializer
 )
+from .facets import get_offer_facets
+from .parsers import NDJSONParser
 from .permissions import IsBusinessUser, IsOfferOwner
-from .filters import OfferFilter, CustomOfferOrderingFilter
+from .filters import OfferFilter, OfferFullTextSearchFilter, CustomOfferOrderingFilter
 
 class StandardResultsSetPagination(PageNumberPagination):
     """Standard pagination configuration for offer lists."""
@@ -25,17 +28,45 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 6
 
-class OfferListCreateView(generics.ListCreateAPIView):
+class OfferCursorPagination(KeysetPagination):
+    """Keyset pagination for offer lists, keyed on the active ordering plus id."""
+    page_size = 6
+    page_size_query_param = 'page_size'
+    max_page_size = 6
+    default_ordering = ('-updated_at',)
+
+class OfferListPagination(StandardResultsSetPagination):
+    """
+    Page-number pagination for offer lists with an opt-in cursor mode.
+    Passing the 'cursor' query parameter (empty for the first page) switches to
+    OfferCursorPagination, which skips the COUNT query and seeks to each page.
+    """
+    cursor_pagination_class = OfferCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+class OfferListCreateView(IdempotentCreateMixin, generics.ListCreateAPIView):
     """
     Lists all offers (GET, with filtering/search/ordering) or creates a new offer (POST).
     If a user is authenticated and no 'creator_id' filter is provided,
     it defaults to showing only the authenticated user's offers.
+    POSTs with an Idempotency-Key header are idempotent (see IdempotentCreateMixin).
     """
     serializer_class = OfferListSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, CustomOfferOrderingFilter]
+    filter_backends = [DjangoFilterBackend, OfferFullTextSearchFilter, CustomOfferOrderingFilter]
     filterset_class = OfferFilter
     search_fields = ['title', 'description']
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OfferListPagination
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
 
@@ -43,20 +74,15 @@ class OfferListCreateView(generics.ListCreateAPIView):
         """
         Overrides the default queryset.
         Filters offers for the current user if authenticated and no 'creator_id' is specified.
-        Annotates min_price and max_price (with defaults for None) and applies distinct().
+        Price and delivery time summaries are read from the denormalized Offer columns.
         """
         user = self.request.user
         creator_id_is_set = 'creator_id' in self.request.query_params
-        default_price_for_null = Value(Decimal('0.00'), output_field=DecimalField())
-
 
         base_queryset = Offer.objects.select_related(
             'user', 'category'
         ).prefetch_related(
             'details'
-        ).annotate(
-            min_price_annotated=Coalesce(Min('details__price'), default_price_for_null),
-            max_price_annotated=Coalesce(Max('details__price'), default_price_for_null)
         )
 
         if user.is_authenticated and not creator_id_is_set:
@@ -64,7 +90,7 @@ class OfferListCreateView(generics.ListCreateAPIView):
         else:
             queryset = base_queryset.all()
 
-        return queryset.distinct()
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -81,6 +107,30 @@ class OfferListCreateView(generics.ListCreateAPIView):
             return [IsAuthenticated(), IsBusinessUser()]
         return [AllowAny()]
 
+    def facets_requested(self):
+        return self.request.query_params.get('facets', '').lower() in ('1', 'true')
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serves the list from the offer list cache when possible. Entries are
+        invalidated by Offer, OfferDetail and Category signals.
+        With '?facets=true' the response also contains 'facets': offer counts
+        per category_id, min_price and max_delivery_time value for the current
+        filters and search, computed with one grouped query.
+        """
+        cache_key = offer_list_cache.get_cache_key(request)
+        cached_data = offer_list_cache.get_response(cache_key)
+        if cached_data is not None:
+            return Response(cached_data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            if self.facets_requested():
+                response.data['facets'] = get_offer_facets(self.filter_queryset(self.get_queryset()))
+            offer_list_cache.set_response(cache_key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
@@ -90,14 +140,53 @@ class OfferListCreateView(generics.ListCreateAPIView):
         return Response(response_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+class OfferBulkImportView(views.APIView):
+    """
+    Imports many offers with their details in one request (business users only).
+    Accepts a JSON list, a JSON object with an 'offers' list, or NDJSON.
+    Valid offers are written in batches; invalid ones are reported by index.
+    """
+    permission_classes = [IsAuthenticated, IsBusinessUser]
+    parser_classes = [JSONParser, NDJSONParser]
+    max_items = 1000
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('offers')
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Expected a list of offers or an object with an "offers" list.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.max_items:
+            return Response(
+                {'error': f'A single import may contain at most {self.max_items} offers.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = OfferImporter(request.user).import_items(items)
+        response_status = status.HTTP_201_CREATED if report['created_count'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
+
+class OfferListCacheStatsView(views.APIView):
+    """Returns hit/miss statistics of the offer list response cache (admin only)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(offer_list_cache.get_stats(), status=status.HTTP_200_OK)
+
+
 class MyOffersListView(generics.ListAPIView):
     """
     Lists offers created by the currently authenticated user.
-    Uses the same serialization and pagination as the general offer list.
+    Uses the same serialization, ordering and pagination as the general offer list.
     """
     serializer_class = OfferListSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    filter_backends = [CustomOfferOrderingFilter]
+    pagination_class = OfferListPagination
 
     def get_queryset(self):
         """
@@ -105,15 +194,11 @@ class MyOffersListView(generics.ListAPIView):
         for the currently authenticated user.
         """
         user = self.request.user
-        default_price_for_null = Value(Decimal('0.00'), output_field=DecimalField())
         queryset = Offer.objects.filter(user=user).select_related(
             'user', 'category'
         ).prefetch_related(
             'details'
-        ).annotate(
-            min_price_annotated=Coalesce(Min('details__price'), default_price_for_null),
-            max_price_annotated=Coalesce(Max('details__price'), default_price_for_null)
-        ).distinct()
+        )
         return queryset
 
     def get_serializer_context(self):
@@ -121,12 +206,24 @@ class MyOffersListView(generics.ListAPIView):
         context.update({"request": self.request})
         return context
 
-class OfferRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    """Retrieves (GET), updates (PATCH), or deletes (DELETE) a specific offer."""
+class OfferRetrieveUpdateDestroyView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    Retrieves (GET), updates (PATCH), or deletes (DELETE) a specific offer.
+    GET supports conditional requests based on the offer's updated_at, which
+    detail writes bump as well, and its category.
+    """
     queryset = Offer.objects.select_related('user', 'category').prefetch_related('details').all()
     lookup_field = 'id'
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
+    def get_validator_values(self):
+        row = Offer.objects.filter(id=self.kwargs['id']).values_list(
+            'id', 'updated_at', 'category_id', 'category__name'
+        ).first()
+        if row is None:
+            return None
+        return row, row[1]
+
     def get_serializer_class(self):
         if self.request.method == 'PATCH' or self.request.method == 'PUT':
             return OfferUpdateSerializer
@@ -152,12 +249,24 @@ class OfferRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         serializer.save()
 
 
-class OfferDetailSpecificView(generics.RetrieveAPIView):
-    """Retrieves details for a specific OfferDetail item."""
+class OfferDetailSpecificView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    Retrieves details for a specific OfferDetail item.
+    Supports conditional requests based on the parent offer's updated_at,
+    which is bumped whenever one of its details is written.
+    """
     queryset = OfferDetail.objects.all()
     serializer_class = OfferDetailSpecificSerializer
     permission_classes = [AllowAny]
     lookup_field = 'id'
+
+    def get_validator_values(self):
+        row = OfferDetail.objects.filter(id=self.kwargs['id']).values_list(
+            'id', 'offer__updated_at'
+        ).first()
+        if row is None:
+            return None
+        return row, row[1]
 # from rest_framework import generics, filters, status
 # from rest_framework.permissions import IsAuthenticated, AllowAny
 # from rest_framework.response import Response
@@ -0,0 +1,159 @@
+"""
+Response cache for GET /api/offers/.
+
+Cache keys are built from the normalized query parameters, the requesting host,
+whether the user is anonymous (and, for the implicit "own offers" listing, the
+user id) plus generation counters for the scopes a response depends on:
+the creator when filtered by creator, the category when filtered by category
+and the global offer list otherwise. Offer, OfferDetail and Category writes
+bump only the affected generations (see offers_app.signals), which makes the
+old entries unreachable instead of flushing the whole cache.
+"""
+import hashlib
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_PREFIX = 'offers:list'
+CACHED_QUERY_PARAMS = (
+    'category_id', 'creator_id', 'min_price', 'max_delivery_time', 'offer_type', 'min_revisions',
+    'search', 'ordering', 'page', 'page_size', 'cursor', 'facets',
+)
+NUMERIC_QUERY_PARAMS = (
+    'category_id', 'creator_id', 'min_price', 'max_delivery_time', 'min_revisions', 'page', 'page_size',
+)
+HITS_KEY = f'{CACHE_PREFIX}:stats:hits'
+MISSES_KEY = f'{CACHE_PREFIX}:stats:misses'
+
+
+def get_timeout():
+    return getattr(settings, 'OFFER_LIST_CACHE_TIMEOUT', 300)
+
+
+def normalize_query_params(query_params):
+    """
+    Returns the query parameters that influence the offer list as a sorted
+    tuple of (name, value) pairs, so equivalent URLs share one cache entry.
+    """
+    normalized = {}
+    for name in CACHED_QUERY_PARAMS:
+        value = query_params.get(name, '').strip()
+        if not value:
+            continue
+        if name in NUMERIC_QUERY_PARAMS:
+            try:
+                value = format(Decimal(value).normalize(), 'f')
+            except InvalidOperation:
+                pass
+        elif name == 'search':
+            value = ' '.join(value.lower().split())
+        elif name == 'facets':
+            value = value.lower()
+        normalized[name] = value
+    if normalized.get('page') == '1':
+        del normalized['page']
+    return tuple(sorted(normalized.items()))
+
+
+def generation_key(scope):
+    return f'{CACHE_PREFIX}:gen:{scope}'
+
+
+def get_generations(scopes):
+    """
+    Returns the current generation for every scope. Missing counters are
+    seeded with a nanosecond timestamp so an evicted counter never restarts
+    at a value an older cache entry was stored under.
+    """
+    keys = [generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return tuple(generations[key] for key in keys)
+
+
+def _bump_generations(scopes):
+    for scope in scopes:
+        key = generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_generations(user_ids=(), category_ids=()):
+    """
+    Invalidates the cached lists of the given creators and categories and the
+    unfiltered list. Bumps immediately and again after the surrounding
+    transaction commits, so a response cached from the pre-commit state by a
+    concurrent request is not served afterwards.
+    """
+    scopes = ['all']
+    scopes += [f'creator:{user_id}' for user_id in set(user_ids) if user_id is not None]
+    scopes += [f'category:{category_id}' for category_id in set(category_ids) if category_id is not None]
+    _bump_generations(scopes)
+    transaction.on_commit(lambda: _bump_generations(scopes))
+
+
+def get_cache_key(request):
+    """
+    Builds the cache key for an offer list request. Authenticated users without
+    a 'creator_id' parameter see their own offers, so their id becomes the
+    creator scope of the key.
+    """
+    params = normalize_query_params(request.query_params)
+    param_map = dict(params)
+    user = request.user
+    own_offers_user_id = None
+    if user.is_authenticated and 'creator_id' not in request.query_params:
+        own_offers_user_id = user.id
+
+    scopes = []
+    creator_id = own_offers_user_id or param_map.get('creator_id')
+    if creator_id:
+        scopes.append(f'creator:{creator_id}')
+    if param_map.get('category_id'):
+        scopes.append(f"category:{param_map['category_id']}")
+    if not scopes:
+        scopes.append('all')
+
+    raw_key = repr((
+        request.get_host(), request.scheme, user.is_anonymous, own_offers_user_id,
+        params, scopes, get_generations(scopes),
+    ))
+    return f'{CACHE_PREFIX}:{hashlib.sha256(raw_key.encode()).hexdigest()}'
+
+
+def _incr(key):
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_response(key):
+    data = cache.get(key)
+    _incr(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_response(key, data):
+    cache.set(key, data, get_timeout())
+
+
+def get_stats():
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,106 @@
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ValidationError
+
+from base_info_app import stats as base_info_stats
+from . import cache as offer_list_cache
+from .api.serializers import OfferImportSerializer
+from .models import Category, Offer, OfferDetail
+
+
+class OfferImporter:
+    """
+    Imports offers with their details in batches for one business user.
+
+    Every item is validated by one shared OfferImportSerializer instance, so the
+    serializer fields are built once per import rather than once per item (the
+    same way a ListSerializer validates its children); valid items of a batch
+    are written with two bulk_create calls (offers, then details) inside one
+    atomic transaction, with the denormalized price and delivery time summary
+    computed up front. Invalid items are skipped and reported with their index.
+    Used by the bulk import endpoint and the import_offers management command.
+    """
+    default_batch_size = 500
+
+    def __init__(self, user, batch_size=None):
+        self.user = user
+        self.batch_size = batch_size or self.default_batch_size
+        self.serializer = OfferImportSerializer(context={
+            'category_ids': set(Category.objects.values_list('id', flat=True))
+        })
+        self.created_ids = []
+        self.errors = []
+        self.item_count = 0
+
+    def import_items(self, items):
+        """
+        Validates and imports an iterable of offer dicts. Can be called several
+        times, e.g. while streaming NDJSON; indexes continue across calls.
+        """
+        batch = []
+        for item in items:
+            index = self.item_count
+            self.item_count += 1
+            validated_data = self.validate_item(index, item)
+            if validated_data is None:
+                continue
+            batch.append((index, validated_data))
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+        return self.get_report()
+
+    def validate_item(self, index, item):
+        if not isinstance(item, dict):
+            self.errors.append({'index': index, 'errors': {'non_field_errors': ['Expected an object.']}})
+            return None
+        try:
+            return self.serializer.run_validation(item)
+        except ValidationError as exc:
+            self.errors.append({'index': index, 'errors': exc.detail})
+            return None
+
+    def build_offer(self, validated_data):
+        details_data = validated_data['details']
+        prices = [detail['price'] for detail in details_data]
+        return Offer(
+            user=self.user,
+            title=validated_data['title'],
+            description=validated_data.get('description', ''),
+            category_id=validated_data.get('category'),
+            min_price=min(prices),
+            max_price=max(prices),
+            min_delivery_time=min(detail['delivery_time_in_days'] for detail in details_data),
+        )
+
+    def write_batch(self, batch):
+        offers = [self.build_offer(validated_data) for _, validated_data in batch]
+        try:
+            with transaction.atomic():
+                Offer.objects.bulk_create(offers)
+                OfferDetail.objects.bulk_create([
+                    OfferDetail(offer=offer, **detail_data)
+                    for offer, (_, validated_data) in zip(offers, batch)
+                    for detail_data in validated_data['details']
+                ])
+        except DatabaseError as exc:
+            for index, _ in batch:
+                self.errors.append({'index': index, 'errors': {'non_field_errors': [str(exc)]}})
+            return
+
+        self.created_ids.extend(offer.id for offer in offers)
+        # bulk_create sends no post_save, which keeps the platform counters current.
+        base_info_stats.apply_delta(offer_count=len(offers))
+        offer_list_cache.bump_generations(
+            user_ids=[self.user.id],
+            category_ids=[offer.category_id for offer in offers]
+        )
+
+    def get_report(self):
+        return {
+            'created_count': len(self.created_ids),
+            'error_count': len(self.errors),
+            'created_ids': self.created_ids,
+            'errors': self.errors,
+        }
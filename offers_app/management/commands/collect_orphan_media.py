@@ -0,0 +1,119 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.image_variants import get_variant_names
+from offers_app.models import Offer
+from profile_app.models import Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes files under the offer image and profile picture directories of MEDIA_ROOT "
+        "that no Offer.image or Profile.profile_picture references any more, including "
+        "the resized variants of those files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only list the orphaned files.")
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help="Keep files modified within this many seconds, e.g. uploads of open transactions (default: 3600)."
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help="Files removed per batch (default: 500).")
+        parser.add_argument('--workers', type=int, default=4, help="Threads scanning and removing files (default: 4).")
+
+    def handle(self, *args, **options):
+        upload_dirs = {
+            Offer._meta.get_field('image').upload_to,
+            Profile._meta.get_field('profile_picture').upload_to,
+        }
+        cutoff = time.time() - options['min_age']
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            # Scan before loading the references, so a file committed while
+            # scanning is already referenced when the two sets are compared.
+            candidates = self.scan(executor, [
+                os.path.join(settings.MEDIA_ROOT, upload_dir) for upload_dir in sorted(upload_dirs)
+            ], cutoff)
+            referenced = self.get_referenced_names()
+            orphans = sorted(name for name in candidates if name not in referenced)
+
+            if options['dry_run']:
+                for name in orphans:
+                    self.stdout.write(name)
+                self.stdout.write(self.style.SUCCESS(f"Found {len(orphans)} orphaned files."))
+                return
+
+            batch_size = options['batch_size']
+            batches = [orphans[start:start + batch_size] for start in range(0, len(orphans), batch_size)]
+            removed, freed = 0, 0
+            for batch_removed, batch_freed in executor.map(self.remove_batch, batches):
+                removed += batch_removed
+                freed += batch_freed
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed} orphaned files ({freed} bytes)."
+        ))
+
+    def scan(self, executor, roots, cutoff):
+        """
+        Lists the storage names of all files older than `cutoff` below `roots`,
+        scanning the directories of each tree level in parallel.
+        """
+        names = []
+        directories = [root for root in roots if os.path.isdir(root)]
+        while directories:
+            subdirectories = []
+            for files, found_directories in executor.map(lambda path: self.scan_directory(path, cutoff), directories):
+                names.extend(files)
+                subdirectories.extend(found_directories)
+            directories = subdirectories
+        return names
+
+    def scan_directory(self, path, cutoff):
+        files, directories = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                    relative_path = os.path.relpath(entry.path, settings.MEDIA_ROOT)
+                    files.append(relative_path.replace(os.sep, '/'))
+        return files, directories
+
+    def get_referenced_names(self):
+        """
+        Returns the names of all referenced images plus the names of their
+        variants, which belong to a referenced image as well.
+        """
+        referenced = set()
+        querysets = [
+            Offer.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True),
+            Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .values_list('profile_picture', flat=True),
+        ]
+        for queryset in querysets:
+            for name in queryset.iterator(chunk_size=2000):
+                referenced.add(name)
+                referenced.update(get_variant_names(name))
+        return referenced
+
+    def remove_batch(self, names):
+        removed, freed = 0, 0
+        for name in names:
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as exc:
+                self.stderr.write(f"Error removing {name}: {exc}")
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
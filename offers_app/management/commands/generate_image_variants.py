@@ -0,0 +1,38 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.image_variants import generate_variants, get_variant_names, wait_for_pending
+from offers_app.models import Offer, mark_image_variants_ready
+from profile_app.models import Profile, mark_picture_variants_ready
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates missing resized variants for offer images and profile pictures, "
+        "e.g. for files uploaded before variants existed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate variants that already exist.")
+
+    def handle(self, *args, **options):
+        offers = Offer.objects.exclude(image='').exclude(image__isnull=True)
+        profiles = Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        if not options['force']:
+            offers = offers.filter(image_variants_ready=False)
+            profiles = profiles.filter(profile_picture_variants_ready=False)
+        images = [(name, mark_image_variants_ready) for name in offers.values_list('image', flat=True)]
+        images += [(name, mark_picture_variants_ready) for name in profiles.values_list('profile_picture', flat=True)]
+
+        queued = 0
+        for name, on_ready in sorted(images, key=lambda image: image[0]):
+            if not default_storage.exists(name):
+                continue
+            if not options['force'] and all(default_storage.exists(v) for v in get_variant_names(name)):
+                on_ready(name)
+                continue
+            generate_variants(name, on_ready)
+            queued += 1
+        wait_for_pending()
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {queued} images."))
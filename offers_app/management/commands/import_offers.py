@@ -0,0 +1,72 @@
+import json
+import sys
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from offers_app.importer import OfferImporter
+
+CustomUser = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports offers with their details from a JSON or NDJSON file for a business user. "
+        "NDJSON files are streamed, so large catalogs do not have to fit in memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the JSON/NDJSON file, or '-' to read from stdin.")
+        parser.add_argument('--user', required=True, help="Username of the business user owning the offers.")
+        parser.add_argument('--format', choices=['json', 'ndjson'], help="Input format (default: by file extension).")
+        parser.add_argument('--batch-size', type=int, default=OfferImporter.default_batch_size)
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['user'], type='business')
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Business user '{options['user']}' not found.")
+
+        path = options['path']
+        input_format = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'json')
+        importer = OfferImporter(user, batch_size=options['batch_size'])
+
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            if input_format == 'ndjson':
+                items = self.read_ndjson(stream)
+                while True:
+                    chunk = list(islice(items, importer.batch_size))
+                    if not chunk:
+                        break
+                    importer.import_items(chunk)
+            else:
+                data = json.load(stream)
+                if isinstance(data, dict):
+                    data = data.get('offers')
+                if not isinstance(data, list):
+                    raise CommandError('Expected a list of offers or an object with an "offers" list.')
+                importer.import_items(data)
+        except ValueError as exc:
+            raise CommandError(f'Could not parse {path}: {exc}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        report = importer.get_report()
+        for error in report['errors']:
+            self.stderr.write(f"Item {error['index']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created_count']} offers, {report['error_count']} failed."
+        ))
+
+    def read_ndjson(self, stream):
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f'line {line_number}: {exc}')
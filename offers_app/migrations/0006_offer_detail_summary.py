@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 19:13
+
+from django.db import migrations, models
+from django.db.models import Max, Min, OuterRef, Subquery
+
+
+def backfill_detail_summary(apps, schema_editor):
+    Offer = apps.get_model('offers_app', 'Offer')
+    OfferDetail = apps.get_model('offers_app', 'OfferDetail')
+
+    def detail_aggregate(aggregate):
+        return Subquery(
+            OfferDetail.objects.filter(offer=OuterRef('pk'))
+            .values('offer')
+            .annotate(value=aggregate)
+            .values('value')[:1]
+        )
+
+    Offer.objects.update(
+        min_price=detail_aggregate(Min('price')),
+        max_price=detail_aggregate(Max('price')),
+        min_delivery_time=detail_aggregate(Min('delivery_time_in_days')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0005_remove_offerdetail_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='max_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Maximum Price'),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='min_delivery_time',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='Minimum Delivery Time (days)'),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='min_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Minimum Price'),
+        ),
+        migrations.RunPython(backfill_detail_summary, migrations.RunPython.noop),
+    ]
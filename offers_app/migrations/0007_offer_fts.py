@@ -0,0 +1,100 @@
+from django.db import migrations
+
+
+DETAIL_TEXT_SQL = """
+    SELECT group_concat(
+        d.title || ' ' || COALESCE(
+            (SELECT group_concat(j.value, ' ') FROM json_each(d.features) AS j), ''
+        ),
+        ' '
+    )
+    FROM offers_app_offerdetail AS d
+    WHERE d.offer_id = {offer_id}
+"""
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE offers_app_offer_fts USING fts5(
+        title, description, details, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER offers_app_offer_fts_ai AFTER INSERT ON offers_app_offer BEGIN
+        INSERT INTO offers_app_offer_fts (rowid, title, description, details)
+        VALUES (new.id, new.title, new.description, '');
+    END
+    """,
+    """
+    CREATE TRIGGER offers_app_offer_fts_au AFTER UPDATE OF title, description ON offers_app_offer BEGIN
+        UPDATE offers_app_offer_fts
+        SET title = new.title, description = new.description
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER offers_app_offer_fts_ad AFTER DELETE ON offers_app_offer BEGIN
+        DELETE FROM offers_app_offer_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER offers_app_offerdetail_fts_ai AFTER INSERT ON offers_app_offerdetail BEGIN
+        UPDATE offers_app_offer_fts
+        SET details = ({detail_text})
+        WHERE rowid = new.offer_id;
+    END
+    """.format(detail_text=DETAIL_TEXT_SQL.format(offer_id='new.offer_id')),
+    """
+    CREATE TRIGGER offers_app_offerdetail_fts_au AFTER UPDATE OF offer_id, title, features ON offers_app_offerdetail BEGIN
+        UPDATE offers_app_offer_fts
+        SET details = ({detail_text})
+        WHERE rowid IN (old.offer_id, new.offer_id);
+    END
+    """.format(detail_text=DETAIL_TEXT_SQL.format(offer_id='offers_app_offer_fts.rowid')),
+    """
+    CREATE TRIGGER offers_app_offerdetail_fts_ad AFTER DELETE ON offers_app_offerdetail BEGIN
+        UPDATE offers_app_offer_fts
+        SET details = ({detail_text})
+        WHERE rowid = old.offer_id;
+    END
+    """.format(detail_text=DETAIL_TEXT_SQL.format(offer_id='old.offer_id')),
+    """
+    INSERT INTO offers_app_offer_fts (rowid, title, description, details)
+    SELECT o.id, o.title, o.description, COALESCE(({detail_text}), '')
+    FROM offers_app_offer AS o
+    """.format(detail_text=DETAIL_TEXT_SQL.format(offer_id='o.id')),
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS offers_app_offerdetail_fts_ad",
+    "DROP TRIGGER IF EXISTS offers_app_offerdetail_fts_au",
+    "DROP TRIGGER IF EXISTS offers_app_offerdetail_fts_ai",
+    "DROP TRIGGER IF EXISTS offers_app_offer_fts_ad",
+    "DROP TRIGGER IF EXISTS offers_app_offer_fts_au",
+    "DROP TRIGGER IF EXISTS offers_app_offer_fts_ai",
+    "DROP TABLE IF EXISTS offers_app_offer_fts",
+]
+
+
+def create_offer_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_offer_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0006_offer_detail_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_offer_fts, drop_offer_fts),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 20:12
+
+import importlib
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+from core.image_variants import get_variant_names
+
+offer_fts = importlib.import_module('offers_app.migrations.0007_offer_fts')
+OFFER_TRIGGER_SQL = [statement for statement in offer_fts.CREATE_SQL if 'ON offers_app_offer BEGIN' in statement]
+
+
+def backfill_variants_ready(apps, schema_editor):
+    """Flags the images whose variants were already rendered before this migration."""
+    Offer = apps.get_model('offers_app', 'Offer')
+    names = Offer.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True)
+    ready = [name for name in names if all(default_storage.exists(v) for v in get_variant_names(name))]
+    Offer.objects.filter(image__in=ready).update(image_variants_ready=True)
+
+
+def restore_offer_fts_triggers(apps, schema_editor):
+    """
+    SQLite adds (and removes) the NOT NULL column by rebuilding
+    offers_app_offer, which drops the search index triggers created in
+    0007_offer_fts. Runs after the field change in both directions.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in OFFER_TRIGGER_SQL:
+        schema_editor.execute(statement.replace('CREATE TRIGGER', 'CREATE TRIGGER IF NOT EXISTS', 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0008_offer_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_offer_fts_triggers),
+        migrations.AddField(
+            model_name='offer',
+            name='image_variants_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Image Variants Ready'),
+        ),
+        migrations.RunPython(restore_offer_fts_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_variants_ready, migrations.RunPython.noop),
+    ]
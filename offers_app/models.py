@@ -1,7 +1,12 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-import os
+from django.db.models import Min, Max
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.image_variants import schedule_variants
+from core.media import delete_on_commit
 
 class Category(models.Model):
     """
@@ -25,8 +30,13 @@ class Offer(models.Model):
     Represents a service offer created by a business user.
     Includes details like title, description, an optional image,
     and links to the user and category.
-    Handles deletion of associated image files when the image is changed
-    or the offer is deleted.
+    Queues deletion of associated image files when the image is changed
+    or the offer is deleted (also by cascade, see `delete_offer_image`)
+    and schedules resized variants of new images; `image_variants_ready`
+    is set once they are rendered (see `mark_image_variants_ready`).
+    The price and delivery time summary of its details is denormalized into
+    `min_price`, `max_price` and `min_delivery_time` so list, filter and
+    ordering paths do not have to aggregate over the details join.
     """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -51,37 +61,81 @@ class Offer(models.Model):
         null=True,
         blank=True
     )
+    image_variants_ready = models.BooleanField(_("Image Variants Ready"), default=False, editable=False)
+    min_price = models.DecimalField(
+        _("Minimum Price"), max_digits=10, decimal_places=2,
+        null=True, blank=True, editable=False, db_index=True
+    )
+    max_price = models.DecimalField(
+        _("Maximum Price"), max_digits=10, decimal_places=2,
+        null=True, blank=True, editable=False, db_index=True
+    )
+    min_delivery_time = models.IntegerField(
+        _("Minimum Delivery Time (days)"),
+        null=True, blank=True, editable=False, db_index=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     __original_image = None
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='offer_updated_at_id_idx'),
+        ]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__original_image = self.image.name if self.image else None
+        self.loaded_category_id = self.__dict__.get('category_id')
 
     def save(self, *args, **kwargs):
         new_image_name = self.image.name if self.image else None
-        if self.pk and new_image_name != self.__original_image:
-            if self.__original_image:
-                old_image_path = os.path.join(settings.MEDIA_ROOT, self.__original_image)
-                if os.path.isfile(old_image_path):
-                    os.remove(old_image_path)
+        image_changed = self._state.adding or new_image_name != self.__original_image
+        if self.pk and image_changed:
+            delete_on_commit(self.__original_image)
+        if image_changed:
+            self.image_variants_ready = False
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'image_variants_ready'}
 
         super().save(*args, **kwargs)
         self.__original_image = self.image.name if self.image else None
+        self.loaded_category_id = self.category_id
+        if image_changed:
+            schedule_variants(self.__original_image, on_ready=mark_image_variants_ready)
 
-    def delete(self, *args, **kwargs):
-        if self.image:
-            image_path = os.path.join(settings.MEDIA_ROOT, self.image.name)
-            if os.path.isfile(image_path):
-                os.remove(image_path)
-        super().delete(*args, **kwargs)
+    def refresh_detail_summary(self):
+        """
+        Recomputes min_price, max_price and min_delivery_time from the offer's
+        details and persists them. Also bumps updated_at, so a change to any
+        detail changes the offer's conditional GET validators.
+        """
+        summary = self.details.aggregate(
+            min_price=Min('price'),
+            max_price=Max('price'),
+            min_delivery_time=Min('delivery_time_in_days')
+        )
+        summary['updated_at'] = timezone.now()
+        Offer.objects.filter(pk=self.pk).update(**summary)
+        for field_name, value in summary.items():
+            setattr(self, field_name, value)
 
     def __str__(self):
         return self.title
 
 
+def mark_image_variants_ready(name):
+    """
+    Records that the variants of the offer image `name` are rendered. Saving
+    bumps updated_at, which changes the offer's conditional GET validators, and
+    the post_save signal invalidates the cached offer lists.
+    """
+    for offer in Offer.objects.filter(image=name, image_variants_ready=False):
+        offer.image_variants_ready = True
+        offer.save(update_fields=['image_variants_ready', 'updated_at'])
+
+
 class OfferDetail(models.Model):
     """
     Represents a detailed version (basic, standard, or premium) of an offer, with its own pricing and features.
@@ -112,3 +166,23 @@ class OfferDetail(models.Model):
 
     def __str__(self):
         return f"{self.offer.title} - {self.title}"
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def update_offer_detail_summary(sender, instance, **kwargs):
+    """
+    Signal receiver to keep the denormalized price and delivery time
+    columns on the parent Offer in sync whenever a detail is written.
+    """
+    Offer(pk=instance.offer_id).refresh_detail_summary()
+
+
+@receiver(post_delete, sender=Offer)
+def delete_offer_image(sender, instance, **kwargs):
+    """
+    Signal receiver to queue the image of a deleted offer for removal.
+    Runs for cascaded and queryset deletes too, which skip Offer.delete().
+    """
+    if instance.image:
+        delete_on_commit(instance.image.name)
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache as offer_list_cache
+from .models import Category, Offer, OfferDetail
+
+OFFER_LIST_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def invalidate_offer_list_for_offer(sender, instance, **kwargs):
+    """
+    Invalidates the cached offer lists of the offer's creator and of its
+    current and previously loaded category.
+    """
+    offer_list_cache.bump_generations(
+        user_ids=[instance.user_id],
+        category_ids=[instance.category_id, instance.loaded_category_id]
+    )
+
+
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def invalidate_offer_list_for_detail(sender, instance, **kwargs):
+    """
+    Invalidates the cached offer lists the detail's parent offer appears in.
+    """
+    owner = Offer.objects.filter(pk=instance.offer_id).values_list('user_id', 'category_id').first()
+    if owner is None:
+        offer_list_cache.bump_generations()
+        return
+    user_id, category_id = owner
+    offer_list_cache.bump_generations(user_ids=[user_id], category_ids=[category_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_offer_list_for_category(sender, instance, **kwargs):
+    """
+    Invalidates the cached offer lists filtered by the category.
+    """
+    offer_list_cache.bump_generations(category_ids=[instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_offer_list_for_creator(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidates the cached lists showing the user's offers when a name shown
+    in their `user_details` changed (loaded_profile_values still holds the
+    stored names here).
+    """
+    if created or not instance.get_changed_profile_fields(update_fields) & OFFER_LIST_USER_FIELDS:
+        return
+    category_ids = Offer.objects.filter(user=instance).values_list('category_id', flat=True).distinct()
+    offer_list_cache.bump_generations(user_ids=[instance.pk], category_ids=list(category_ids))
@@ -1,11 +1,30 @@
 # offers_app/tests.py
 
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework import serializers, status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 # Passe ggf. den Importpfad für die Modelle an
+from django.core.cache import cache
 from .models import Offer, OfferDetail, Category
+from core.image_variants import get_variant_name
+from .api.serializers import OfferListSerializer
+from .api.views import OfferListCreateView
+from .api.filters import OfferFilter
 # Stelle sicher, dass das CustomUser Model importiert wird
 from user_auth_app.models import CustomUser # Oder: CustomUser = get_user_model()
 
@@ -374,4 +393,770 @@ class OfferAPITests(APITestCase):
     def test_retrieve_offerdetail_not_found(self):
         """ Testet Abrufen eines nicht existierenden OfferDetail (404) """
         response = self.client.get(self.detail_non_existent_url)
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+def create_user(username, type='business', **extra_fields):
+    return CustomUser.objects.create_user(
+        username=username, password='password123', email=f'{username}@example.com', type=type, **extra_fields
+    )
+
+
+def create_offer(user, title, details=(), **fields):
+    """ Legt ein Angebot mit je einem Detail pro (offer_type, price, delivery_time_in_days, revisions) an """
+    offer = Offer.objects.create(user=user, title=title, **fields)
+    for offer_type, price, delivery_time_in_days, revisions in details:
+        OfferDetail.objects.create(
+            offer=offer, title=offer_type.capitalize(), price=price,
+            delivery_time_in_days=delivery_time_in_days, revisions=revisions, offer_type=offer_type
+        )
+    return offer
+
+
+class OfferTestCase(APITestCase):
+    """ Gemeinsame Grundlage: ein Anbieter, die Listen-URL und ein leerer Cache in jedem Test """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_user = create_user('offer_provider')
+        cls.offer_list_create_url = reverse('offers_api:offer-list-create')
+
+    def setUp(self):
+        cache.clear()
+
+
+class OfferWithDetailsTestCase(OfferTestCase):
+    """ Zusätzlich ein Angebot mit Basic- (100, 7 Tage) und Premium-Detail (400, 3 Tage) """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.offer = create_offer(
+            cls.business_user, "Test Angebot", details=[('basic', 100, 7, 1), ('premium', 400, 3, 3)]
+        )
+        cls.detail_basic, cls.detail_premium = cls.offer.details.order_by('id')
+
+
+class OfferDetailSummaryTests(OfferWithDetailsTestCase):
+
+    def test_summary_columns_follow_detail_writes(self):
+        """ Testet, dass min/max Preis und min Lieferzeit bei Detail-Änderungen aktualisiert werden """
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 100)
+        self.assertEqual(self.offer.max_price, 400)
+        self.assertEqual(self.offer.min_delivery_time, 3)
+
+        self.detail_basic.price = 50
+        self.detail_basic.save()
+        self.detail_premium.delete()
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 50)
+        self.assertEqual(self.offer.max_price, 50)
+        self.assertEqual(self.offer.min_delivery_time, 7)
+
+    def test_create_offer_sets_summary(self):
+        """ Testet, dass beim Erstellen über die API die Zusammenfassung gesetzt wird """
+        self.client.force_authenticate(user=self.business_user)
+        post_data = {
+            "title": "Neu",
+            "details": [
+                {"title": "B", "price": 20, "delivery_time_in_days": 9, "revisions": 1, "features": [], "offer_type": "basic"},
+                {"title": "P", "price": 80, "delivery_time_in_days": 4, "revisions": 2, "features": [], "offer_type": "premium"},
+            ]
+        }
+        response = self.client.post(self.offer_list_create_url, post_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        offer = Offer.objects.get(id=response.data['id'])
+        self.assertEqual(offer.min_price, 20)
+        self.assertEqual(offer.max_price, 80)
+        self.assertEqual(offer.min_delivery_time, 4)
+
+    def test_list_reads_summary_without_aggregates(self):
+        """ Testet, dass die Liste keine Aggregat-Abfragen pro Angebot ausführt """
+        for i in range(3):
+            offer = Offer.objects.create(user=self.business_user, title=f"Extra {i}")
+            OfferDetail.objects.create(
+                offer=offer, title="Basic", price=10 + i, delivery_time_in_days=2,
+                revisions=1, offer_type='basic'
+            )
+        with self.assertNumQueries(3):
+            response = self.client.get(self.offer_list_create_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        offer_data = next(item for item in response.data['results'] if item['id'] == self.offer.id)
+        self.assertEqual(offer_data['min_price'], 100)
+        self.assertEqual(offer_data['min_delivery_time'], 3)
+
+    def test_filter_and_ordering_use_summary(self):
+        """ Testet Filter max_delivery_time und Sortierung nach min_price """
+        cheap = Offer.objects.create(user=self.business_user, title="Cheap")
+        OfferDetail.objects.create(
+            offer=cheap, title="Basic", price=10, delivery_time_in_days=30,
+            revisions=1, offer_type='basic'
+        )
+        response = self.client.get(self.offer_list_create_url, {'max_delivery_time': 5})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.offer.id])
+
+        response = self.client.get(self.offer_list_create_url, {'ordering': 'min_price'})
+        self.assertEqual(response.data['results'][0]['id'], cheap.id)
+
+
+class TemplatedHyperlinkedIdentityFieldTests(OfferWithDetailsTestCase):
+
+
+    @override_settings(ALLOWED_HOSTS=['api.example.com'])
+    def test_detail_urls_match_hyperlinked_identity_field(self):
+        """ Testet, dass die Detail-URLs in der Liste identisch zu HyperlinkedIdentityField sind """
+        offers = Offer.objects.prefetch_related('details')
+        request = APIRequestFactory().get(self.offer_list_create_url, HTTP_HOST='api.example.com')
+        context = {'request': Request(request)}
+        reference = serializers.HyperlinkedIdentityField(view_name='offers_api:offerdetail-detail', lookup_field='id')
+        reference.bind('url', serializers.Serializer(context=context))
+
+        data = OfferListSerializer(offers, many=True, context=context).data
+        urls = [detail['url'] for offer_data in data for detail in offer_data['details']]
+        expected = [reference.to_representation(detail) for offer in offers for detail in offer.details.all()]
+        self.assertEqual(urls, expected)
+        self.assertEqual(urls[0], f"http://api.example.com/api/offerdetails/{self.detail_basic.id}/")
+
+
+class OfferUpdateDetailsTests(OfferWithDetailsTestCase):
+
+    def test_patch_details_single_bulk_update(self):
+        """ Testet, dass geänderte Details mit einem UPDATE geschrieben werden und das Angebot unverändert bleibt """
+        self.client.force_authenticate(user=self.business_user)
+        self.offer.refresh_from_db()
+        patch_data = {"details": [
+            {"offer_type": "basic", "price": 60, "title": "Basic"},
+            {"offer_type": "premium", "revisions": 5},
+        ]}
+        url = reverse('offers_api:offer-detail', kwargs={'id': self.offer.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, patch_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        detail_updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "offers_app_offerdetail"')]
+        self.assertEqual(len(detail_updates), 1)
+        self.assertFalse(any('"title" =' in q['sql'] for q in queries if q['sql'].startswith('UPDATE "offers_app_offer"')))
+
+        self.detail_basic.refresh_from_db()
+        self.detail_premium.refresh_from_db()
+        self.assertEqual(self.detail_basic.price, 60)
+        self.assertEqual(self.detail_premium.revisions, 5)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.min_price, 60)
+
+    def test_patch_without_changes_writes_nothing(self):
+        """ Testet, dass ein PATCH ohne Änderungen nichts schreibt """
+        self.client.force_authenticate(user=self.business_user)
+        self.offer.refresh_from_db()
+        updated_at = self.offer.updated_at
+        patch_data = {"title": "Test Angebot", "details": [{"offer_type": "basic", "price": "100.00"}]}
+        url = reverse('offers_api:offer-detail', kwargs={'id': self.offer.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, patch_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in queries))
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.updated_at, updated_at)
+
+
+class OfferIdempotencyTests(OfferTestCase):
+
+    def test_create_offer_with_idempotency_key(self):
+        """ Testet, dass ein wiederholtes Erstellen mit gleichem Idempotency-Key kein zweites Angebot anlegt """
+        self.client.force_authenticate(user=self.business_user)
+        post_data = {
+            "title": "Einmalig",
+            "details": [
+                {"title": "B", "price": 20, "delivery_time_in_days": 9, "revisions": 1, "features": [], "offer_type": "basic"},
+            ]
+        }
+        first = self.client.post(self.offer_list_create_url, post_data, format='json', HTTP_IDEMPOTENCY_KEY='offer-1')
+        replay = self.client.post(self.offer_list_create_url, post_data, format='json', HTTP_IDEMPOTENCY_KEY='offer-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(Offer.objects.filter(title="Einmalig").count(), 1)
+
+
+class OfferFullTextSearchTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.api_offer = create_offer(cls.business_user, "API Entwicklung", description="Backend für Webshops")
+        cls.logo_offer = create_offer(cls.business_user, "Logo Design", description="Ein API Logo")
+        OfferDetail.objects.create(
+            offer=cls.logo_offer, title="Basic Logo", price=100, delivery_time_in_days=3,
+            revisions=2, features=["Vektorgrafik", "Übersetzung"], offer_type='basic'
+        )
+
+    def search(self, term):
+        response = self.client.get(self.offer_list_create_url, {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_prefix_and_detail_features(self):
+        """ Testet Präfixsuche sowie Suche in Detail-Titeln und Features """
+        self.assertEqual(self.search('Entwick'), [self.api_offer.id])
+        self.assertEqual(self.search('vektor'), [self.logo_offer.id])
+        self.assertEqual(self.search('ubersetzung'), [self.logo_offer.id])
+        self.assertEqual(self.search('"logo" ('), [self.logo_offer.id])
+
+    def test_search_ranks_title_matches_first(self):
+        """ Testet, dass Treffer im Titel vor Treffern in der Beschreibung stehen """
+        self.assertEqual(self.search('api'), [self.api_offer.id, self.logo_offer.id])
+
+    def test_search_uses_match_subquery(self):
+        """ Testet, dass die Suche per MATCH-Unterabfrage filtert statt die FTS-Tabelle zu joinen """
+        with CaptureQueriesContext(connection) as queries:
+            self.search('api')
+        list_query = next(query['sql'] for query in queries if 'bm25' in query['sql'])
+        self.assertIn('"offers_app_offer"."id" IN (SELECT rowid FROM offers_app_offer_fts', list_query)
+        self.assertNotIn('FROM "offers_app_offer" , "offers_app_offer_fts"', list_query)
+
+    def test_search_index_follows_writes(self):
+        """ Testet, dass der Suchindex bei Änderungen und Löschungen aktualisiert wird """
+        self.api_offer.title = "Datenbank Tuning"
+        self.api_offer.save()
+        self.assertEqual(self.search('tuning'), [self.api_offer.id])
+        self.assertEqual(self.search('entwicklung'), [])
+
+        OfferDetail.objects.filter(offer=self.logo_offer).update(title="Premium Branding")
+        self.assertEqual(self.search('branding'), [self.logo_offer.id])
+
+        OfferDetail.objects.filter(offer=self.logo_offer).delete()
+        self.assertEqual(self.search('vektor'), [])
+
+        self.logo_offer.delete()
+        self.assertEqual(self.search('logo'), [])
+
+
+class OfferFacetTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.design = Category.objects.create(name="Design")
+        cls.code = Category.objects.create(name="Code")
+        for title, category, price, days in [
+            ("Logo Design", cls.design, 40, 2),
+            ("Flyer Design", cls.design, 120, 5),
+            ("Web Backend", cls.code, 600, 20),
+            ("Ohne Kategorie", None, 80, 1),
+        ]:
+            create_offer(cls.business_user, title, details=[('basic', price, days, 1)], category=category)
+
+    def test_facets_counts(self):
+        """ Testet die Facetten-Zählungen für Kategorie, Preis und Lieferzeit """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.offer_list_create_url, {'facets': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len([q for q in queries if 'GROUP BY' in q['sql']]), 1)
+
+        facets = response.data['facets']
+        self.assertEqual(facets['category_id'], [
+            {'id': self.design.id, 'name': "Design", 'count': 2},
+            {'id': self.code.id, 'name': "Code", 'count': 1},
+        ])
+        self.assertEqual(
+            [(bucket['value'], bucket['count']) for bucket in facets['min_price']],
+            [(50, 1), (100, 2), (250, 3), (500, 3), (1000, 4)]
+        )
+        self.assertEqual(
+            [(bucket['value'], bucket['count']) for bucket in facets['max_delivery_time']],
+            [(1, 1), (3, 2), (7, 3), (14, 3), (30, 4)]
+        )
+
+        response = self.client.get(self.offer_list_create_url, {'min_price': 250})
+        self.assertEqual(response.data['count'], 3)
+        self.assertNotIn('facets', response.data)
+
+    def test_facets_follow_filters_and_search(self):
+        """ Testet, dass die Facetten die aktuellen Filter und die Suche berücksichtigen """
+        response = self.client.get(self.offer_list_create_url, {'facets': '1', 'search': 'design'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['facets']['category_id'], [{'id': self.design.id, 'name': "Design", 'count': 2}])
+        self.assertEqual(response.data['facets']['min_price'][-1]['count'], 2)
+
+        response = self.client.get(self.offer_list_create_url, {'facets': 'true', 'category_id': self.code.id})
+        self.assertEqual(response.data['facets']['max_delivery_time'][-1], {'value': 30, 'count': 1})
+
+    def test_facets_with_search_in_cursor_mode(self):
+        """ Testet Facetten zusammen mit Volltextsuche und Cursor-Paginierung """
+        response = self.client.get(self.offer_list_create_url, {'search': 'design', 'cursor': '', 'facets': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['facets']['category_id'], [{'id': self.design.id, 'name': "Design", 'count': 2}])
+
+
+class OfferDetailPredicateFilterTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for title, price, days in [
+            ("Logo Design", 40, 2),
+            ("Flyer Design", 120, 5),
+            ("Web Backend", 600, 20),
+            ("Visitenkarten", 80, 1),
+        ]:
+            create_offer(cls.business_user, title, details=[('basic', price, days, 1)])
+
+    def test_detail_predicates_use_exists(self):
+        """ Testet, dass Detail-Filter auf dasselbe Detail per EXISTS ohne DISTINCT angewendet werden """
+        flyer = Offer.objects.get(title="Flyer Design")
+        OfferDetail.objects.create(
+            offer=flyer, title="Premium", price=300, delivery_time_in_days=3,
+            revisions=5, offer_type='premium'
+        )
+        response = self.client.get(self.offer_list_create_url, {'offer_type': 'premium', 'min_revisions': 3})
+        self.assertEqual([item['id'] for item in response.data['results']], [flyer.id])
+        response = self.client.get(self.offer_list_create_url, {'offer_type': 'basic', 'min_revisions': 3})
+        self.assertEqual(response.data['count'], 0)
+        response = self.client.get(self.offer_list_create_url, {'offer_type': 'basic', 'max_delivery_time': 5})
+        self.assertEqual(response.data['count'], 3)
+
+        request = APIRequestFactory().get(self.offer_list_create_url, {
+            'offer_type': 'basic', 'min_revisions': 1, 'max_delivery_time': 5, 'min_price': 500
+        })
+        view = OfferListCreateView()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        queryset = view.filter_queryset(view.get_queryset())
+        self.assertIn('EXISTS', str(queryset.query))
+        self.assertNotIn('JOIN "offers_app_offerdetail"', str(queryset.query))
+        plan = queryset.explain()
+        self.assertNotIn('TEMP B-TREE FOR DISTINCT', plan)
+        self.assertIn('CORRELATED', plan)
+
+    def test_single_detail_filter_outside_offer_filter(self):
+        """ Testet, dass ein einzelner Detail-Filter auch außerhalb von OfferFilter per EXISTS filtert """
+        flyer = Offer.objects.get(title="Flyer Design")
+        OfferDetail.objects.create(
+            offer=flyer, title="Premium", price=300, delivery_time_in_days=3,
+            revisions=5, offer_type='premium'
+        )
+        queryset = OfferFilter.base_filters['min_revisions'].filter(Offer.objects.all(), 3)
+        self.assertEqual(list(queryset), [flyer])
+        self.assertIn('EXISTS', str(queryset.query))
+        self.assertEqual(OfferFilter.base_filters['offer_type'].filter(Offer.objects.all(), None).count(), 4)
+
+
+class OfferCursorPaginationTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.offers = [
+            create_offer(cls.business_user, f"Cursor {i}", details=[('basic', 100 + (i % 3) * 10, 2, 1)])
+            for i in range(8)
+        ]
+        cls.empty_offer = create_offer(cls.business_user, "Ohne Details")
+
+    def collect_pages(self, params):
+        ids = []
+        response = self.client.get(self.offer_list_create_url, {'cursor': '', 'page_size': 3, **params})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_pages_match_full_ordering(self):
+        """ Testet, dass die Cursor-Seiten die vollständige Sortierung ohne Lücken abbilden """
+        for ordering, expected in (
+            ('-updated_at', Offer.objects.order_by('-updated_at', '-id')),
+            ('min_price', Offer.objects.order_by('min_price', 'id')),
+            ('-min_price', Offer.objects.order_by('-min_price', '-id')),
+        ):
+            with self.subTest(ordering=ordering):
+                self.assertEqual(
+                    self.collect_pages({'ordering': ordering}),
+                    list(expected.values_list('id', flat=True))
+                )
+
+    def test_cursor_page_skips_count(self):
+        """ Testet, dass im Cursor-Modus keine COUNT-Abfrage ausgeführt wird """
+        with self.assertNumQueries(2):
+            response = self.client.get(self.offer_list_create_url, {'cursor': ''})
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        """ Testet, dass ein ungültiger Cursor 404 liefert """
+        response = self.client.get(self.offer_list_create_url, {'cursor': 'kaputt'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pages_follow_search_rank(self):
+        """ Testet, dass Cursor-Seiten einer Suche der Rang-Sortierung lückenlos folgen """
+        self.assertEqual(
+            self.collect_pages({'search': 'cursor'}),
+            list(Offer.objects.filter(title__startswith="Cursor").order_by('-updated_at', '-id').values_list('id', flat=True))
+        )
+
+
+class OfferListCacheTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_business_user = create_user('cache_other')
+        cls.admin_user = CustomUser.objects.create_superuser(
+            username='cache_admin', password='password123', email='cache_admin@example.com'
+        )
+        cls.category = Category.objects.create(name='Cache Kategorie')
+        cls.offer = create_offer(
+            cls.business_user, "Cache Angebot", details=[('basic', 100, 3, 1)], category=cls.category
+        )
+        cls.detail = cls.offer.details.get()
+        cls.other_offer = create_offer(cls.other_business_user, "Anderes Angebot")
+        cls.cache_stats_url = reverse('offers_api:offer-list-cache-stats')
+
+    def test_second_request_is_served_from_cache(self):
+        """ Testet, dass eine wiederholte, gleichwertige Anfrage ohne DB-Abfragen beantwortet wird """
+        response = self.client.get(self.offer_list_create_url, {'creator_id': self.business_user.id})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.offer_list_create_url, {'creator_id': f' 0{self.business_user.id}', 'page': 1})
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.data, response.data)
+
+    def test_creator_rename_invalidates_cached_lists(self):
+        """ Testet, dass eine Namensänderung des Erstellers die gecachten Listen mit seinen Angeboten invalidiert """
+        for params in ({'creator_id': self.business_user.id}, {'category_id': self.category.id}, {}):
+            self.client.get(self.offer_list_create_url, params)
+        self.business_user.first_name = 'Umbenannt'
+        self.business_user.save(update_fields=['first_name'])
+
+        for params in ({'creator_id': self.business_user.id}, {'category_id': self.category.id}, {}):
+            response = self.client.get(self.offer_list_create_url, params)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            offer_data = next(item for item in response.data['results'] if item['id'] == self.offer.id)
+            self.assertEqual(offer_data['user_details']['first_name'], 'Umbenannt')
+
+        self.business_user.email = 'cache_neu@example.com'
+        self.business_user.save()
+        response = self.client.get(self.offer_list_create_url, {'creator_id': self.business_user.id})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_detail_write_invalidates_only_affected_scopes(self):
+        """ Testet, dass Detail-Änderungen nur betroffene Ersteller-/Kategorie-Listen invalidieren """
+        own_params = {'creator_id': self.business_user.id}
+        other_params = {'creator_id': self.other_business_user.id}
+        self.client.get(self.offer_list_create_url, own_params)
+        self.client.get(self.offer_list_create_url, other_params)
+
+        self.detail.price = 80
+        self.detail.save()
+
+        response = self.client.get(self.offer_list_create_url, own_params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['min_price'], 80)
+        self.assertEqual(self.client.get(self.offer_list_create_url, other_params)['X-Cache'], 'HIT')
+
+    def test_category_change_invalidates_old_and_new_category(self):
+        """ Testet, dass ein Kategoriewechsel die alte Kategorie-Liste invalidiert """
+        params = {'category_id': self.category.id}
+        self.assertEqual(self.client.get(self.offer_list_create_url, params).data['count'], 1)
+
+        offer = Offer.objects.get(id=self.offer.id)
+        offer.category = None
+        offer.save()
+
+        response = self.client.get(self.offer_list_create_url, params)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_authenticated_own_list_is_cached_per_user(self):
+        """ Testet, dass die eigene Angebotsliste pro Benutzer gecacht wird """
+        self.client.get(self.offer_list_create_url)
+        self.client.force_authenticate(user=self.business_user)
+        response = self.client.get(self.offer_list_create_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.offer.id])
+
+    def test_cache_stats_admin_only(self):
+        """ Testet die Hit/Miss-Statistik (nur für Admins) """
+        self.client.get(self.offer_list_create_url)
+        self.client.get(self.offer_list_create_url)
+        self.assertEqual(self.client.get(self.cache_stats_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.cache_stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+        self.assertEqual(response.data['hit_rate'], 0.5)
+
+
+class OfferConditionalGetTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.offer = create_offer(cls.business_user, "ETag Angebot", details=[('basic', 100, 3, 1)])
+        cls.detail = cls.offer.details.get()
+        cls.offer_url = reverse('offers_api:offer-detail', kwargs={'id': cls.offer.id})
+        cls.detail_url = reverse('offers_api:offerdetail-detail', kwargs={'id': cls.detail.id})
+
+    def test_offer_and_detail_not_modified(self):
+        """ Testet 304 für Angebot und Angebotsdetail mit einer einzigen Abfrage """
+        for url in (self.offer_url, self.detail_url):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_write_changes_validators(self):
+        """ Testet, dass eine Detail-Änderung die Validatoren von Angebot und Detail ändert """
+        offer_etag = self.client.get(self.offer_url)['ETag']
+        detail_etag = self.client.get(self.detail_url)['ETag']
+
+        self.detail.price = 90
+        self.detail.save()
+
+        response = self.client.get(self.offer_url, HTTP_IF_NONE_MATCH=offer_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['min_price'], 90)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_offer_still_404(self):
+        """ Testet, dass nicht existierende Angebote weiterhin 404 liefern """
+        response = self.client.get(reverse('offers_api:offer-detail', kwargs={'id': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OfferBulkImportTests(OfferTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer_user = create_user('import_customer', type='customer')
+        cls.category = Category.objects.create(name='Import Kategorie')
+        cls.import_url = reverse('offers_api:offer-bulk-import')
+
+    def offer_payload(self, title, category=None):
+        return {
+            "title": title,
+            "description": "Importiert",
+            "category": category,
+            "details": [
+                {"title": "Basic", "price": 30, "delivery_time_in_days": 6, "revisions": 1, "features": ["A"], "offer_type": "basic"},
+                {"title": "Premium", "price": 90, "delivery_time_in_days": 2, "revisions": 3, "features": ["A", "B"], "offer_type": "premium"},
+            ]
+        }
+
+    def test_import_json_reports_item_errors(self):
+        """ Testet den JSON-Import mit Fehlern pro Eintrag """
+        self.client.force_authenticate(user=self.business_user)
+        payload = {"offers": [
+            self.offer_payload("Import 1", self.category.id),
+            {"title": "Ohne Details", "details": []},
+            self.offer_payload("Import 2", 9999),
+            self.offer_payload("Import 3"),
+        ]}
+        response = self.client.post(self.import_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('details', response.data['errors'][0]['errors'])
+        self.assertIn('category', response.data['errors'][1]['errors'])
+
+        offer = Offer.objects.get(title="Import 1")
+        self.assertEqual(offer.user, self.business_user)
+        self.assertEqual(offer.category, self.category)
+        self.assertEqual(offer.details.count(), 2)
+        self.assertEqual(offer.min_price, 30)
+        self.assertEqual(offer.max_price, 90)
+        self.assertEqual(offer.min_delivery_time, 2)
+
+        search = self.client.get(reverse('offers_api:offer-list-create'), {'search': 'import', 'creator_id': self.business_user.id})
+        self.assertEqual(search.data['count'], 2)
+
+    def test_import_ndjson(self):
+        """ Testet den NDJSON-Import """
+        self.client.force_authenticate(user=self.business_user)
+        body = "\n".join(json.dumps(self.offer_payload(f"Zeile {i}")) for i in range(3)) + "\n"
+        response = self.client.post(self.import_url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created_count'], 3)
+        self.assertEqual(OfferDetail.objects.filter(offer__title__startswith="Zeile").count(), 6)
+
+    def test_import_customer_forbidden(self):
+        """ Testet, dass Customer User nicht importieren dürfen """
+        self.client.force_authenticate(user=self.customer_user)
+        response = self.client.post(self.import_url, [self.offer_payload("X")], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_management_command(self):
+        """ Testet den Management-Befehl import_offers """
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as import_file:
+            for i in range(5):
+                import_file.write(json.dumps(self.offer_payload(f"Befehl {i}")) + "\n")
+        self.addCleanup(os.remove, import_file.name)
+        out = io.StringIO()
+        call_command('import_offers', import_file.name, user=self.business_user.username, batch_size=2, stdout=out)
+        self.assertIn('Imported 5 offers', out.getvalue())
+        self.assertEqual(Offer.objects.filter(title__startswith="Befehl").count(), 5)
+
+
+class OfferImageVariantTests(OfferTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, IMAGE_VARIANT_WORKERS=0, MEDIA_DELETION_WORKERS=0
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def make_image(self, name='bild.png', size=(2000, 1000)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, format='PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def variant_path(self, name, variant):
+        return os.path.join(self.media_root, get_variant_name(name, variant))
+
+    def test_variants_generated_after_commit(self):
+        """ Testet, dass die Varianten nach dem Commit erzeugt und ausgeliefert werden """
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = Offer.objects.create(user=self.business_user, title="Mit Bild", image=self.make_image())
+
+        with Image.open(self.variant_path(offer.image.name, 'thumb')) as thumb:
+            self.assertEqual(thumb.size, (160, 80))
+        with Image.open(self.variant_path(offer.image.name, 'full')) as full:
+            self.assertEqual(full.size, (1600, 800))
+
+        response = self.client.get(reverse('offers_api:offer-detail', kwargs={'id': offer.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['image_variants']['card'].endswith(get_variant_name(offer.image.name, 'card')))
+
+    def test_variants_fall_back_to_original(self):
+        """ Testet, dass ohne erzeugte Varianten das Originalbild ausgeliefert wird """
+        offer = Offer.objects.create(user=self.business_user, title="Ohne Commit", image=self.make_image())
+        response = self.client.get(reverse('offers_api:offer-detail', kwargs={'id': offer.id}))
+        self.assertEqual(response.data['image_variants']['thumb'], response.data['image'])
+
+    def test_variants_ready_invalidates_cached_representations(self):
+        """ Testet, dass fertige Varianten updated_at erhöhen und die gecachte Liste invalidieren """
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            offer = Offer.objects.create(user=self.business_user, title="Später fertig", image=self.make_image())
+        list_url = reverse('offers_api:offer-list-create')
+        response = self.client.get(list_url, {'creator_id': self.business_user.id})
+        self.assertEqual(response.data['results'][0]['image_variants']['thumb'], response.data['results'][0]['image'])
+        stale_updated_at = offer.updated_at
+
+        for callback in callbacks:
+            callback()
+        offer.refresh_from_db()
+        self.assertTrue(offer.image_variants_ready)
+        self.assertGreater(offer.updated_at, stale_updated_at)
+
+        response = self.client.get(list_url, {'creator_id': self.business_user.id})
+        self.assertTrue(
+            response.data['results'][0]['image_variants']['thumb'].endswith(get_variant_name(offer.image.name, 'thumb'))
+        )
+
+    def test_variant_urls_without_storage_lookups(self):
+        """ Testet, dass die Varianten-URLs ohne Dateisystemzugriff aus dem Flag erzeugt werden """
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = Offer.objects.create(user=self.business_user, title="Ohne Lookup", image=self.make_image())
+        with mock.patch.object(default_storage, 'exists', side_effect=AssertionError("exists() called")):
+            response = self.client.get(reverse('offers_api:offer-detail', kwargs={'id': offer.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['image_variants']['full'].endswith(get_variant_name(offer.image.name, 'full')))
+
+    def test_replaced_image_resets_variants_ready(self):
+        """ Testet, dass ein neues Bild bis zum Rendern wieder das Original ausliefert """
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = Offer.objects.create(user=self.business_user, title="Neu", image=self.make_image('erst.png'))
+        offer.image = self.make_image('zweit.png')
+        offer.save(update_fields=['image'])
+        offer.refresh_from_db()
+        self.assertFalse(offer.image_variants_ready)
+
+    def test_variants_removed_with_image(self):
+        """ Testet, dass Varianten beim Bildwechsel und Löschen entfernt werden """
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = Offer.objects.create(user=self.business_user, title="Wechsel", image=self.make_image('alt.png'))
+        old_thumb = self.variant_path(offer.image.name, 'thumb')
+        self.assertTrue(os.path.isfile(old_thumb))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.image = self.make_image('neu.png')
+            offer.save()
+        self.assertFalse(os.path.isfile(old_thumb))
+        new_thumb = self.variant_path(offer.image.name, 'thumb')
+        self.assertTrue(os.path.isfile(new_thumb))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.delete()
+        self.assertFalse(os.path.isfile(new_thumb))
+
+    def test_replaced_image_kept_on_rollback(self):
+        """ Testet, dass das alte Bild bei einem Rollback erhalten bleibt """
+        offer = Offer.objects.create(user=self.business_user, title="Rollback", image=self.make_image('bleibt.png'))
+        old_path = os.path.join(self.media_root, offer.image.name)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            try:
+                with transaction.atomic():
+                    offer.image = self.make_image('verworfen.png')
+                    offer.save()
+                    raise DatabaseError("rollback")
+            except DatabaseError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertTrue(os.path.isfile(old_path))
+
+    def test_cascaded_delete_removes_images(self):
+        """ Testet, dass beim Löschen des Users auch Angebotsbild und Profilbild entfernt werden """
+        user = CustomUser.objects.create_user(
+            username='kaskade', password='password123', email='kaskade@example.com', type='business'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = Offer.objects.create(user=user, title="Kaskade", image=self.make_image('kaskade.png'))
+            user.profile.profile_picture = self.make_image('profil.png')
+            user.profile.save()
+        paths = [
+            os.path.join(self.media_root, offer.image.name),
+            os.path.join(self.media_root, user.profile.profile_picture.name),
+            self.variant_path(offer.image.name, 'thumb'),
+        ]
+        self.assertTrue(all(os.path.isfile(path) for path in paths))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+        self.assertFalse(any(os.path.isfile(path) for path in paths))
+
+    def test_collect_orphan_media(self):
+        """ Testet, dass der Befehl collect_orphan_media nur unreferenzierte Dateien entfernt """
+        with self.captureOnCommitCallbacks(execute=True):
+            offer = Offer.objects.create(user=self.business_user, title="Referenziert", image=self.make_image('ref.png'))
+        referenced = [os.path.join(self.media_root, offer.image.name), self.variant_path(offer.image.name, 'card')]
+        orphans = [
+            os.path.join(self.media_root, 'offer_images', 'waise.png'),
+            os.path.join(self.media_root, 'offer_images', 'variants', 'waise_thumb.png'),
+            os.path.join(self.media_root, 'profile_pics', 'waise.png'),
+        ]
+        for path in orphans:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as orphan_file:
+                orphan_file.write(b'x')
+
+        out = io.StringIO()
+        call_command('collect_orphan_media', min_age=0, batch_size=2, stdout=out)
+        self.assertIn('Removed 3 orphaned files', out.getvalue())
+        self.assertTrue(all(os.path.isfile(path) for path in referenced))
+        self.assertFalse(any(os.path.isfile(path) for path in orphans))
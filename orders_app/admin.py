@@ -18,20 +18,21 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = [
         'id',
         'customer__username',
-        'offer_detail__title',
-        'offer_detail__offer__user__username'
+        'title',
+        'business_user__username'
     ]
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = [
+        'business_user', 'title', 'revisions', 'delivery_time_in_days', 'price',
+        'features', 'offer_type', 'created_at', 'updated_at'
+    ]
+    list_select_related = ['customer', 'business_user']
 
     @admin.display(description='Offer Title')
     def get_offer_title(self, obj):
-        if obj.offer_detail:
-            return obj.offer_detail.title
-        return None
+        return obj.title
 
     @admin.display(description='Seller')
     def get_seller_username(self, obj):
-        if obj.offer_detail and obj.offer_detail.offer and obj.offer_detail.offer.user:
-            seller = obj.offer_detail.offer.user
-            return seller.username 
-        return None
\ No newline at end of file
+        if obj.business_user:
+            return obj.business_user.username
+        return None
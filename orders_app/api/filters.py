@@ -0,0 +1,22 @@
+from django_filters import rest_framework as filters
+from ..models import Order
+
+class OrderFilter(filters.FilterSet):
+    """
+    FilterSet for order lists by status and creation time.
+
+    - `status`: one of the Order status values.
+    - `created_after`: orders created at or after this ISO 8601 date/time.
+    - `created_before`: orders created before this ISO 8601 date/time.
+
+    Together with the customer or provider condition of the list these map
+    onto the (customer|business_user, status, created_at) indexes.
+    """
+
+    status = filters.ChoiceFilter(choices=Order.STATUS_CHOICES)
+    created_after = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = Order
+        fields = ['status', 'created_after', 'created_before']
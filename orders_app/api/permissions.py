@@ -15,21 +15,16 @@ class IsCustomerUser(permissions.BasePermission):
 class IsOrderParticipant(permissions.BasePermission):
     """
     Object-level permission to allow access to either the customer who placed the order
-    or the provider assigned to it via the offer.
+    or the provider assigned to it.
     """
 
     def has_object_permission(self, request, view, obj):
         """
         Return True if the request user is either the customer of the order
-        or the provider associated with the offer detail.
+        or its provider (business_user).
         """
-        is_customer = obj.customer == request.user
-        is_provider = False
-        try:
-            if obj.offer_detail and obj.offer_detail.offer:
-                is_provider = obj.offer_detail.offer.user == request.user
-        except AttributeError:
-            pass
+        is_customer = obj.customer_id == request.user.id
+        is_provider = obj.business_user_id == request.user.id
         return is_customer or is_provider
 
 
@@ -52,14 +47,9 @@ class IsOrderProvider(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         """
-        Return True if the request user is the provider associated with the offer detail
+        Return True if the request user is the provider (business_user) of the order
         and has the user type 'business'.
         """
-        is_provider = False
-        try:
-            if obj.offer_detail and obj.offer_detail.offer and obj.offer_detail.offer.user:
-                is_provider = (obj.offer_detail.offer.user == request.user and
-                               request.user.type == 'business')
-        except AttributeError:
-            pass
+        is_provider = (obj.business_user_id == request.user.id and
+                       request.user.type == 'business')
         return bool(request.user and request.user.is_authenticated and is_provider)
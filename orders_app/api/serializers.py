@@ -12,16 +12,17 @@ class OrderSerializer(serializers.ModelSerializer):
     """
     Serializer for representing Order instances with a flat structure.
     Used for list views, detail views, and responses after create/update.
-    Includes customer ID, business user ID (provider), and flattened offer detail fields.
+    Includes customer ID, business user ID (provider), and the offer detail fields
+    snapshotted on the order at purchase time, so it reads no related rows.
     """
-    customer_user = serializers.IntegerField(source='customer.id', read_only=True)
-    business_user = serializers.SerializerMethodField()
-    title = serializers.CharField(source='offer_detail.title', read_only=True)
-    revisions = serializers.IntegerField(source='offer_detail.revisions', read_only=True)
-    delivery_time_in_days = serializers.IntegerField(source='offer_detail.delivery_time_in_days', read_only=True)
-    price = serializers.DecimalField(source='offer_detail.price', read_only=True, max_digits=10, decimal_places=2)
-    features = serializers.JSONField(source='offer_detail.features', read_only=True)
-    offer_type = serializers.CharField(source='offer_detail.offer_type', read_only=True)
+    customer_user = serializers.IntegerField(source='customer_id', read_only=True)
+    business_user = serializers.IntegerField(source='business_user_id', read_only=True)
+    title = serializers.CharField(read_only=True)
+    revisions = serializers.IntegerField(read_only=True)
+    delivery_time_in_days = serializers.IntegerField(read_only=True)
+    price = serializers.DecimalField(read_only=True, max_digits=10, decimal_places=2)
+    features = serializers.JSONField(read_only=True)
+    offer_type = serializers.CharField(read_only=True)
 
     class Meta:
         model = Order
@@ -31,16 +32,6 @@ class OrderSerializer(serializers.ModelSerializer):
             'status', 'created_at', 'updated_at'
         )
 
-    def get_business_user(self, obj):
-        """
-        Retrieves the ID of the business user (provider) associated with the order's offer detail.
-        Returns None if the related objects are not found.
-        """
-        try:
-            return obj.offer_detail.offer.user.id
-        except AttributeError:
-            return None
-
 class OrderCreateSerializer(serializers.Serializer):
     """
     Serializer for creating a new Order.
@@ -49,7 +40,7 @@ class OrderCreateSerializer(serializers.Serializer):
     The initial 'status' is set to 'pending' (or as defined in the model).
     """
     offer_detail_id = serializers.PrimaryKeyRelatedField(
-        queryset=OfferDetail.objects.all(),
+        queryset=OfferDetail.objects.select_related('offer'),
         write_only=True
     )
 
@@ -62,7 +53,8 @@ class OrderCreateSerializer(serializers.Serializer):
         order = Order.objects.create(
             customer=customer,
             offer_detail=offer_detail,
-            status=Order.STATUS_IN_PROGRESS
+            status=Order.STATUS_IN_PROGRESS,
+            **Order.snapshot_fields(offer_detail)
         )
         return order
 
@@ -4,7 +4,8 @@ from .views import (
     OrderDetailView,
     BusinessOrderListView,
     CompletedOrdersCountView,
-    InProgressOrdersCountView
+    InProgressOrdersCountView,
+    OrderStatsView
 )
 
 app_name = 'orders_api'
@@ -15,4 +16,6 @@ urlpatterns = [
     path('orders/business/<int:business_user_id>/', BusinessOrderListView.as_view(), name='business-order-list'),
     path('completed-order-count/<int:business_user_id>/', CompletedOrdersCountView.as_view(), name='completed-order-count'),
     path('order-count/<int:business_user_id>/', InProgressOrdersCountView.as_view(), name='inprogress-orders-count'),
+    path('order-stats/', OrderStatsView.as_view(), name='order-stats-batch'),
+    path('order-stats/<int:business_user_id>/', OrderStatsView.as_view(), name='order-stats'),
 ]
\ No newline at end of file
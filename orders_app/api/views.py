@@ -1,22 +1,40 @@
 from rest_framework import generics, status, views, permissions
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from django.db.models import Q, Count
-from django.contrib.auth import get_user_model
+from django.utils.cache import quote_etag
+from django.utils.http import parse_etags
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 
+from core.mixins import IdempotentCreateMixin
+from core.pagination import KeysetPagination
 from ..models import Order
+from ..stats import get_order_status_counts
 from .serializers import (
     OrderSerializer,
     OrderCreateSerializer,
     OrderUpdateStatusSerializer
 )
+from .filters import OrderFilter
 from .permissions import IsCustomerUser, IsOrderParticipant, IsOrderCustomer, IsOrderProvider
 from offers_app.models import OfferDetail 
 
-CustomUser = get_user_model()
-
-class OrderListCreateView(generics.ListCreateAPIView):
-    """Lists orders relevant to the logged-in user (GET) or creates a new order (POST)."""
+class OrderCursorPagination(KeysetPagination):
+    """Keyset pagination for order lists, newest first."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    default_ordering = ('-created_at',)
+
+class OrderListCreateView(IdempotentCreateMixin, generics.ListCreateAPIView):
+    """
+    Lists orders relevant to the logged-in user (GET) or creates a new order (POST).
+    The user's orders as customer and as provider are read by two index-driven
+    queries combined with UNION instead of one OR that cannot use an index.
+    POSTs with an Idempotency-Key header are idempotent (see IdempotentCreateMixin).
+    """
+    pagination_class = OrderCursorPagination
+    filter_backends = []
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -30,11 +48,22 @@ class OrderListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Order.objects.filter(
-            Q(customer=user) | Q(offer_detail__offer__user=user)
-        ).select_related(
-            'customer', 'offer_detail', 'offer_detail__offer', 'offer_detail__offer__user'
-        ).distinct()
+        orders = Order.objects.order_by()
+        if self.request.method == 'GET':
+            orders = self.filter_orders(orders)
+        return orders.filter(customer=user).union(
+            orders.filter(business_user=user)
+        ).order_by('-created_at', '-id')
+
+    def filter_orders(self, queryset):
+        """
+        Applies OrderFilter to a branch of the union; a union() queryset cannot
+        be filtered afterwards, so this replaces the filter backend.
+        """
+        filterset = OrderFilter(self.request.query_params, queryset=queryset, request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.qs
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={'request': request})
@@ -45,10 +74,11 @@ class OrderListCreateView(generics.ListCreateAPIView):
         return Response(response_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
-    """Retrieves (GET), updates status (PATCH), or deletes (DELETE) a specific order."""
-    queryset = Order.objects.select_related(
-        'customer', 'offer_detail', 'offer_detail__offer', 'offer_detail__offer__user'
-    ).all()
+    """
+    Retrieves (GET), updates status (PATCH), or deletes (DELETE) a specific order.
+    GET and PATCH responses carry the order's version as ETag.
+    """
+    queryset = Order.objects.all()
     lookup_field = 'id'
 
     def get_serializer_class(self):
@@ -65,61 +95,125 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
             return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
         return super().get_permissions()
 
+    def get_etag(self, order):
+        return quote_etag(str(order.version))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': self.get_etag(instance)})
+
     def update(self, request, *args, **kwargs):
-        partial = kwargs.pop('partial', True)
+        """
+        Changes the status with a single conditional UPDATE (see
+        Order.transition_status). The expected version is the one loaded here
+        or, if sent, the one in the If-Match header (the ETag of a previous
+        GET/PATCH). Requesting the current status at the expected version is
+        a no-op. Returns 409 if the transition is not allowed or the order
+        was changed in the meantime.
+        """
         instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-        instance.refresh_from_db()
+
+        new_status = serializer.validated_data.get('status')
+        if new_status is not None:
+            expected_version = instance.version
+            if_match = [etag for etag in parse_etags(request.headers.get('If-Match', '')) if etag != '*']
+            if if_match:
+                try:
+                    expected_version = int(if_match[0].removeprefix('W/').strip('"'))
+                except ValueError:
+                    return Response({'error': 'Invalid If-Match header.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            if new_status != instance.status and not Order.can_transition(instance.status, new_status):
+                return Response(
+                    {'error': f"Cannot change order status from '{instance.status}' to '{new_status}'."},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if new_status == instance.status:
+                modified = expected_version != instance.version
+            else:
+                modified = not instance.transition_status(new_status, expected_version)
+            if modified:
+                return Response(
+                    {'error': 'The order was modified by another request. Reload it and try again.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+
         response_serializer = OrderSerializer(instance, context=self.get_serializer_context())
-        return Response(response_serializer.data)
+        return Response(response_serializer.data, headers={'ETag': self.get_etag(instance)})
 
 class BusinessOrderListView(generics.ListAPIView):
-    """Lists all orders associated with a specific business user (provider)."""
+    """
+    Lists all orders associated with a specific business user (provider),
+    optionally filtered by status and creation time.
+    """
     serializer_class = OrderSerializer
     permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
         business_user_id = self.kwargs.get('business_user_id')
         if not business_user_id:
             return Order.objects.none()
-        return Order.objects.filter(
-            offer_detail__offer__user__id=business_user_id
-        ).select_related(
-            'customer', 'offer_detail', 'offer_detail__offer', 'offer_detail__offer__user'
-        )
+        return Order.objects.filter(business_user_id=business_user_id)
+
+class OrderStatsView(views.APIView):
+    """
+    Returns the order counts per status of one business user, or with
+    '?business_user_ids=1,2,3' of a batch of business users, computed with a
+    single grouped query.
+    """
+    permission_classes = [AllowAny]
+    max_batch_size = 100
+
+    def get(self, request, business_user_id=None, *args, **kwargs):
+        if business_user_id is not None:
+            stats = get_order_status_counts([business_user_id]).get(business_user_id)
+            if stats is None:
+                return Response({'error': 'Business user not found.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'business_user': business_user_id, **stats}, status=status.HTTP_200_OK)
+
+        try:
+            business_user_ids = [
+                int(value) for value in request.query_params.get('business_user_ids', '').split(',') if value.strip()
+            ]
+        except ValueError:
+            return Response({'error': 'Invalid business user ID.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not business_user_ids:
+            return Response({'error': 'business_user_ids is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(business_user_ids) > self.max_batch_size:
+            return Response(
+                {'error': f'At most {self.max_batch_size} business user IDs are allowed.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        stats = get_order_status_counts(business_user_ids)
+        results = [
+            {'business_user': user_id, **stats[user_id]}
+            for user_id in dict.fromkeys(business_user_ids) if user_id in stats
+        ]
+        return Response(results, status=status.HTTP_200_OK)
 
 class CompletedOrdersCountView(views.APIView):
     """Returns the count of completed orders for a specific business user."""
     permission_classes = [AllowAny]
 
     def get(self, request, business_user_id, *args, **kwargs):
-        try:
-            if not CustomUser.objects.filter(id=business_user_id, type='business').exists():
-                 return Response({'error': 'Business user not found.'}, status=status.HTTP_404_NOT_FOUND)
-        except ValueError:
-             return Response({'error': 'Invalid business user ID.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        count = Order.objects.filter(
-            offer_detail__offer__user__id=business_user_id,
-            status=Order.STATUS_COMPLETED
-        ).count()
-        return Response({'completed_order_count': count}, status=status.HTTP_200_OK)
+        stats = get_order_status_counts([business_user_id]).get(business_user_id)
+        if stats is None:
+            return Response({'error': 'Business user not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'completed_order_count': stats[Order.STATUS_COMPLETED]}, status=status.HTTP_200_OK)
 
 class InProgressOrdersCountView(views.APIView):
     """Returns the count of 'in_progress' orders for a specific business user."""
     permission_classes = [AllowAny]
 
     def get(self, request, business_user_id, *args, **kwargs):
-        try:
-            if not CustomUser.objects.filter(id=business_user_id, type='business').exists():
-                 return Response({'error': 'Business user not found.'}, status=status.HTTP_404_NOT_FOUND)
-        except ValueError:
-             return Response({'error': 'Invalid business user ID.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        count = Order.objects.filter(
-            offer_detail__offer__user__id=business_user_id,
-            status=Order.STATUS_IN_PROGRESS
-        ).count()
-        return Response({'order_count': count}, status=status.HTTP_200_OK)
\ No newline at end of file
+        stats = get_order_status_counts([business_user_id]).get(business_user_id)
+        if stats is None:
+            return Response({'error': 'Business user not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'order_count': stats[Order.STATUS_IN_PROGRESS]}, status=status.HTTP_200_OK)
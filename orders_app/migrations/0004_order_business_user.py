@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 21:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_business_user(apps, schema_editor):
+    Order = apps.get_model('orders_app', 'Order')
+    OfferDetail = apps.get_model('offers_app', 'OfferDetail')
+    Order.objects.update(
+        business_user=Subquery(
+            OfferDetail.objects.filter(pk=OuterRef('offer_detail_id')).values('offer__user_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0008_offer_keyset_index'),
+        ('orders_app', '0003_alter_order_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='business_user',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='orders_as_provider', to=settings.AUTH_USER_MODEL, verbose_name='Business User'),
+        ),
+        migrations.RunPython(backfill_business_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='business_user',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='orders_as_provider', to=settings.AUTH_USER_MODEL, verbose_name='Business User'),
+        ),
+    ]
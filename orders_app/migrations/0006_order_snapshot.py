@@ -0,0 +1,87 @@
+# Generated by Django 5.2 on 2026-10-18 19:52
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+SNAPSHOT_FIELDS = ('title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
+
+
+def backfill_snapshot(apps, schema_editor):
+    Order = apps.get_model('orders_app', 'Order')
+    OfferDetail = apps.get_model('offers_app', 'OfferDetail')
+    detail = OfferDetail.objects.filter(pk=OuterRef('offer_detail_id'))
+    Order.objects.update(**{
+        field_name: Subquery(detail.values(field_name)[:1]) for field_name in SNAPSHOT_FIELDS
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offers_app', '0008_offer_keyset_index'),
+        ('orders_app', '0005_order_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='title',
+            field=models.CharField(editable=False, max_length=100, null=True, verbose_name='Title'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='revisions',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Revisions'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Delivery Time (days)'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='Price'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(default=list, editable=False, null=True, verbose_name='Features'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(choices=[('basic', 'Basic'), ('standard', 'Standard'), ('premium', 'Premium')], editable=False, max_length=20, null=True, verbose_name='Offer Type'),
+        ),
+        migrations.RunPython(backfill_snapshot, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='title',
+            field=models.CharField(editable=False, max_length=100, verbose_name='Title'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='revisions',
+            field=models.IntegerField(editable=False, verbose_name='Revisions'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.IntegerField(editable=False, verbose_name='Delivery Time (days)'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, verbose_name='Price'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(default=list, editable=False, verbose_name='Features'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(choices=[('basic', 'Basic'), ('standard', 'Standard'), ('premium', 'Premium')], editable=False, max_length=20, verbose_name='Offer Type'),
+        ),
+    ]
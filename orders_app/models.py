@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from offers_app.models import OfferDetail
 
@@ -9,6 +11,13 @@ class Order(models.Model):
     Represents an order placed by a customer for a specific offer detail.
     Manages the status of the order and links to the customer and the
     particular service package (OfferDetail) they are purchasing.
+    The provider of that package is denormalized into `business_user`, so
+    provider lookups do not have to join through the detail and the offer.
+    The package's title, revisions, delivery time, price, features and type
+    are snapshotted at purchase time, so later edits of the offer do not
+    change historic orders and lists need no joins.
+    Status changes follow STATUS_TRANSITIONS and are guarded by `version`
+    (optimistic concurrency, see `transition_status`).
     """
 
     STATUS_IN_PROGRESS = "in_progress"
@@ -21,11 +30,19 @@ class Order(models.Model):
         (STATUS_CANCELLED, _("Cancelled")),
     )
 
+    # Allowed status changes; completed and cancelled orders are final.
+    STATUS_TRANSITIONS = {
+        STATUS_IN_PROGRESS: (STATUS_COMPLETED, STATUS_CANCELLED),
+        STATUS_COMPLETED: (),
+        STATUS_CANCELLED: (),
+    }
+
     customer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="orders_as_customer",
         verbose_name=_("Customer"),
+        db_index=False,
     )
     offer_detail = models.ForeignKey(
         OfferDetail,
@@ -33,16 +50,95 @@ class Order(models.Model):
         related_name="orders",
         verbose_name=_("Offer Detail"),
     )
+    business_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="orders_as_provider",
+        verbose_name=_("Business User"),
+        editable=False,
+        db_index=False,
+    )
+    title = models.CharField(_("Title"), max_length=100, editable=False)
+    revisions = models.IntegerField(_("Revisions"), editable=False)
+    delivery_time_in_days = models.IntegerField(_("Delivery Time (days)"), editable=False)
+    price = models.DecimalField(_("Price"), max_digits=10, decimal_places=2, editable=False)
+    features = models.JSONField(_("Features"), default=list, editable=False)
+    offer_type = models.CharField(
+        _("Offer Type"), max_length=20, choices=OfferDetail.OFFER_TYPE_CHOICES, editable=False
+    )
     status = models.CharField(
         _("Status"), max_length=20, choices=STATUS_CHOICES, default=STATUS_IN_PROGRESS
     )
+    version = models.PositiveIntegerField(_("Version"), default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    @staticmethod
+    def snapshot_fields(offer_detail):
+        """
+        Returns the Order field values copied from an OfferDetail (with its
+        offer loaded) at purchase time.
+        """
+        return {
+            "business_user_id": offer_detail.offer.user_id,
+            "title": offer_detail.title,
+            "revisions": offer_detail.revisions,
+            "delivery_time_in_days": offer_detail.delivery_time_in_days,
+            "price": offer_detail.price,
+            "features": offer_detail.features,
+            "offer_type": offer_detail.offer_type,
+        }
+
+    @classmethod
+    def can_transition(cls, from_status, to_status):
+        return to_status in cls.STATUS_TRANSITIONS.get(from_status, ())
+
+    def transition_status(self, new_status, expected_version=None):
+        """
+        Changes the status with one conditional UPDATE that only matches if the
+        row still has `expected_version` (default: the loaded version) and a
+        status the transition table allows to move to `new_status`.
+        Returns False, leaving the instance unchanged, if nothing matched.
+        """
+        version = self.version if expected_version is None else expected_version
+        allowed_from = [
+            status for status in self.STATUS_TRANSITIONS if self.can_transition(status, new_status)
+        ]
+        now = timezone.now()
+        updated = Order.objects.filter(
+            pk=self.pk, version=version, status__in=allowed_from
+        ).update(status=new_status, version=F("version") + 1, updated_at=now)
+        if not updated:
+            return False
+        self.status = new_status
+        self.version = version + 1
+        self.updated_at = now
+        return True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.offer_detail_id is not None and self.price is None:
+            offer_detail = OfferDetail.objects.select_related("offer").get(pk=self.offer_detail_id)
+            for field_name, value in self.snapshot_fields(offer_detail).items():
+                setattr(self, field_name, value)
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return (
-            f"Order {self.id} by {self.customer.username} for {self.offer_detail.title}"
+            f"Order {self.id} by {self.customer.username} for {self.title}"
         )
 
     class Meta:
         ordering = ["-created_at"]
+        # Lead with the customer/provider columns (which replaces their single
+        # column FK indexes): the list filters on one of them, optionally on
+        # status, and orders or ranges by created_at.
+        indexes = [
+            models.Index(fields=["customer", "status", "created_at"], name="order_customer_status_idx"),
+            models.Index(fields=["business_user", "status", "created_at"], name="order_provider_status_idx"),
+            models.Index(fields=["customer", "created_at"], name="order_customer_created_idx"),
+            models.Index(fields=["business_user", "created_at"], name="order_provider_created_idx"),
+        ]
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from .models import Order
+
+CustomUser = get_user_model()
+
+
+def get_order_status_counts(business_user_ids):
+    """
+    Returns {business_user_id: {status: count, ..., 'total': count}} with a
+    count for every Order status, for those of the given ids that belong to
+    business users.
+
+    Existence check and counts come from one query: business users LEFT
+    JOINed to their orders and grouped by user and status, so users without
+    orders still appear (with a NULL status group).
+    """
+    rows = (
+        CustomUser.objects.filter(id__in=business_user_ids, type='business')
+        .values('id', 'orders_as_provider__status')
+        .annotate(count=Count('orders_as_provider'))
+        .order_by()
+    )
+    stats = {}
+    for row in rows:
+        counts = stats.setdefault(row['id'], {
+            **{status: 0 for status, _ in Order.STATUS_CHOICES}, 'total': 0
+        })
+        status = row['orders_as_provider__status']
+        if status is not None:
+            counts[status] = counts.get(status, 0) + row['count']
+            counts['total'] += row['count']
+    return stats
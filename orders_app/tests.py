@@ -1,13 +1,21 @@
 # orders_app/tests.py
 
+import io
 import json
+from datetime import timedelta
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.db import connection
+from django.core.management import call_command
 from django.db.models import Q
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 # Passe Importpfade ggf. an
+from core.models import IdempotencyKey
 from .models import Order
 from offers_app.models import Offer, OfferDetail, Category
 # Stelle sicher, dass das CustomUser Model importiert wird
@@ -87,12 +95,12 @@ class OrderAPITests(APITestCase):
         response = self.client.get(self.list_create_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Customer 1 ist Kunde bei Order 1 (P: B1) und Order 3 (P: B2)
-        self.assertEqual(len(response.data), 2)
-        order_ids = {item['id'] for item in response.data}
+        self.assertEqual(len(response.data['results']), 2)
+        order_ids = {item['id'] for item in response.data['results']}
         self.assertIn(self.order1.id, order_ids)
         self.assertIn(self.order3.id, order_ids)
         # Prüfe Struktur eines Eintrags (flach)
-        order_data = response.data[0]
+        order_data = response.data['results'][0]
         expected_keys = {
             'id', 'customer_user', 'business_user', 'title', 'revisions',
             'delivery_time_in_days', 'price', 'features', 'offer_type',
@@ -107,8 +115,8 @@ class OrderAPITests(APITestCase):
         response = self.client.get(self.list_create_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Business User 1 ist Anbieter für Order 1, 2, 4
-        self.assertEqual(len(response.data), 3)
-        order_ids = {item['id'] for item in response.data}
+        self.assertEqual(len(response.data['results']), 3)
+        order_ids = {item['id'] for item in response.data['results']}
         self.assertIn(self.order1.id, order_ids)
         self.assertIn(self.order2.id, order_ids)
         self.assertIn(self.order4.id, order_ids)
@@ -259,8 +267,8 @@ class OrderAPITests(APITestCase):
         response = self.client.get(self.business1_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Business User 1 ist Anbieter für Order 1, 2, 4
-        self.assertEqual(len(response.data), 3)
-        order_ids = {item['id'] for item in response.data}
+        self.assertEqual(len(response.data['results']), 3)
+        order_ids = {item['id'] for item in response.data['results']}
         self.assertIn(self.order1.id, order_ids)
         self.assertIn(self.order2.id, order_ids)
         self.assertIn(self.order4.id, order_ids)
@@ -270,14 +278,14 @@ class OrderAPITests(APITestCase):
         response = self.client.get(self.business2_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Business User 2 ist Anbieter für Order 3
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['id'], self.order3.id)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['id'], self.order3.id)
 
     def test_list_business_orders_non_existent_empty(self):
         """ Test: Auflisten für nicht existierenden Business User gibt leere Liste """
         response = self.client.get(self.business_non_existent_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     # === GET /api/completed-order-count/{id}/ Tests ===
 
@@ -329,3 +337,318 @@ class OrderAPITests(APITestCase):
         """ Test: Zählen für nicht existierenden User gibt 404 """
         response = self.client.get(self.business_non_existent_inprogress_count_url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrderTestCase(APITestCase):
+    """ Gemeinsame Grundlage: zwei Anbieter, ein Kunde und zwei Bestellungen auf ein Basic-Paket """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_user = CustomUser.objects.create_user(
+            username='denorm_provider', password='password123', email='denorm_provider@example.com',
+            type='business'
+        )
+        cls.other_business_user = CustomUser.objects.create_user(
+            username='denorm_other', password='password123', email='denorm_other@example.com',
+            type='business'
+        )
+        cls.customer_user = CustomUser.objects.create_user(
+            username='denorm_customer', password='password123', email='denorm_customer@example.com',
+            type='customer'
+        )
+        offer = Offer.objects.create(user=cls.business_user, title="Denormalisiert")
+        cls.detail = OfferDetail.objects.create(
+            offer=offer, title="Basic", price=50, delivery_time_in_days=3, revisions=1, offer_type='basic'
+        )
+        cls.order = Order.objects.create(customer=cls.customer_user, offer_detail=cls.detail)
+        Order.objects.create(customer=cls.customer_user, offer_detail=cls.detail, status=Order.STATUS_COMPLETED)
+
+
+class OrderBusinessUserTests(OrderTestCase):
+
+    def test_business_user_set_on_create(self):
+        """ Testet, dass business_user beim Erstellen gesetzt wird """
+        self.assertEqual(self.order.business_user, self.business_user)
+        self.client.force_authenticate(user=self.customer_user)
+        response = self.client.post(reverse('orders_api:order-list-create'), {'offer_detail_id': self.detail.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['business_user'], self.business_user.id)
+        self.assertEqual(Order.objects.get(id=response.data['id']).business_user, self.business_user)
+
+    def test_read_paths_use_business_user_column(self):
+        """ Testet, dass Listen, Zählungen und Berechtigungen ohne Join über Angebot und Detail auskommen """
+        self.client.force_authenticate(user=self.business_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('orders_api:order-list-create'))
+            self.client.get(reverse('orders_api:business-order-list', kwargs={'business_user_id': self.business_user.id}))
+            self.client.get(reverse('orders_api:completed-order-count', kwargs={'business_user_id': self.business_user.id}))
+            self.client.get(reverse('orders_api:order-detail', kwargs={'id': self.order.id}))
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertTrue(all(item['business_user'] == self.business_user.id for item in response.data['results']))
+        self.assertFalse(any('"offers_app_offer' in query['sql'] for query in queries))
+
+    def test_provider_permissions(self):
+        """ Testet die Anbieter-Berechtigungen über business_user """
+        url = reverse('orders_api:order-detail', kwargs={'id': self.order.id})
+        self.client.force_authenticate(user=self.other_business_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.patch(url, {'status': 'completed'}, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.business_user)
+        response = self.client.patch(url, {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'completed')
+
+class OrderStatsTests(OrderTestCase):
+
+    def test_order_stats_single_query(self):
+        """ Testet die Bestellstatistik pro Status mit einer gruppierten Abfrage """
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('orders_api:order-stats', kwargs={'business_user_id': self.business_user.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'business_user': self.business_user.id, 'in_progress': 1, 'completed': 1, 'cancelled': 0, 'total': 2
+        })
+
+        response = self.client.get(reverse('orders_api:order-stats', kwargs={'business_user_id': self.customer_user.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_stats_batch(self):
+        """ Testet die Bestellstatistik für mehrere Business User """
+        ids = f'{self.other_business_user.id},{self.business_user.id},{self.customer_user.id}'
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('orders_api:order-stats-batch'), {'business_user_ids': ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['business_user'] for item in response.data], [self.other_business_user.id, self.business_user.id])
+        self.assertEqual(response.data[0]['total'], 0)
+        self.assertEqual(response.data[1]['in_progress'], 1)
+
+        response = self.client.get(reverse('orders_api:order-stats-batch'), {'business_user_ids': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_count_endpoints_project_stats(self):
+        """ Testet, dass die Zähl-Endpunkte die Statistik mit einer Abfrage projizieren """
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('orders_api:completed-order-count', kwargs={'business_user_id': self.business_user.id}))
+        self.assertEqual(response.data, {'completed_order_count': 1})
+        response = self.client.get(reverse('orders_api:inprogress-orders-count', kwargs={'business_user_id': self.business_user.id}))
+        self.assertEqual(response.data, {'order_count': 1})
+        response = self.client.get(reverse('orders_api:inprogress-orders-count', kwargs={'business_user_id': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrderListPaginationTests(OrderTestCase):
+
+    def test_order_list_union_and_cursor(self):
+        """ Testet die je Zweig begrenzte UNION-Abfrage und die Cursor-Paginierung der Bestellliste """
+        customer_offer = Offer.objects.create(user=self.other_business_user, title="Andere Seite")
+        customer_detail = OfferDetail.objects.create(
+            offer=customer_offer, title="Basic", price=20, delivery_time_in_days=1, revisions=1, offer_type='basic'
+        )
+        for _ in range(3):
+            Order.objects.create(customer=self.customer_user, offer_detail=customer_detail)
+        Order.objects.create(customer=self.customer_user, offer_detail=customer_detail)
+
+        self.client.force_authenticate(user=self.customer_user)
+        url = reverse('orders_api:order-list-create')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        branch_queries = [query['sql'] for query in queries[-2:]]
+        self.assertIn('"orders_app_order"."customer_id" =', branch_queries[0])
+        self.assertIn('"orders_app_order"."business_user_id" =', branch_queries[1])
+        self.assertTrue(all('LIMIT 21' in sql and ' OR ' not in sql for sql in branch_queries))
+        expected = list(Order.objects.filter(customer=self.customer_user).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual([item['id'] for item in response.data['results']], expected)
+        self.assertIsNone(response.data['next'])
+
+        ids = []
+        response = self.client.get(url, {'page_size': 4})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(ids, expected)
+
+        self.client.force_authenticate(user=self.business_user)
+        response = self.client.get(url)
+        self.assertEqual([item['id'] for item in response.data['results']], list(
+            Order.objects.filter(business_user=self.business_user).order_by('-created_at', '-id').values_list('id', flat=True)
+        ))
+
+
+class OrderListFilterTests(OrderTestCase):
+
+    def test_order_list_filters(self):
+        """ Testet die Filter status, created_after und created_before der Bestelllisten """
+        old_order = Order.objects.create(customer=self.customer_user, offer_detail=self.detail)
+        Order.objects.filter(pk=old_order.pk).update(created_at=timezone.now() - timedelta(days=30))
+        week_ago = (timezone.now() - timedelta(days=7)).isoformat()
+
+        self.client.force_authenticate(user=self.customer_user)
+        response = self.client.get(reverse('orders_api:order-list-create'), {'status': 'in_progress', 'created_after': week_ago})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.order.id])
+        response = self.client.get(reverse('orders_api:order-list-create'), {'created_before': week_ago})
+        self.assertEqual([item['id'] for item in response.data['results']], [old_order.id])
+        response = self.client.get(reverse('orders_api:order-list-create'), {'status': 'unbekannt'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        business_url = reverse('orders_api:business-order-list', kwargs={'business_user_id': self.business_user.id})
+        response = self.client.get(business_url, {'status': 'in_progress', 'created_after': week_ago})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.order.id])
+        response = self.client.get(business_url, {'status': 'completed'})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_provider_status_range_uses_index(self):
+        """ Testet, dass 'in Bearbeitung diese Woche' eines Anbieters ein Index-Bereichsscan ist """
+        queryset = Order.objects.filter(
+            business_user=self.business_user, status=Order.STATUS_IN_PROGRESS,
+            created_at__gte=timezone.now() - timedelta(days=7)
+        ).order_by('-created_at')
+        plan = queryset.explain()
+        self.assertIn('order_provider_status_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class OrderSnapshotTests(OrderTestCase):
+
+    def test_order_snapshot_survives_offer_edits(self):
+        """ Testet, dass Bestellungen die Paketdaten zum Kaufzeitpunkt behalten """
+        self.client.force_authenticate(user=self.customer_user)
+        response = self.client.post(reverse('orders_api:order-list-create'), {'offer_detail_id': self.detail.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['price'], '50.00')
+
+        OfferDetail.objects.filter(pk=self.detail.pk).update(title="Teurer", price=80, revisions=3)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('orders_api:order-detail', kwargs={'id': response.data['id']}))
+        self.assertEqual(response.data['title'], "Basic")
+        self.assertEqual(response.data['price'], '50.00')
+        self.assertEqual(response.data['revisions'], 1)
+        self.assertEqual(response.data['offer_type'], 'basic')
+
+
+class OrderStatusTransitionTests(OrderTestCase):
+
+    def test_status_transition_conditional_update(self):
+        """ Testet den bedingten Statuswechsel mit Versionsprüfung und 409 bei Konflikten """
+        url = reverse('orders_api:order-detail', kwargs={'id': self.order.id})
+        self.client.force_authenticate(user=self.business_user)
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(etag, '"1"')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'status': 'completed'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response['ETag'], '"2"')
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"version" = 1', updates[0])
+        self.assertTrue(queries[-1]['sql'].startswith('UPDATE'))
+
+        response = self.client.patch(url, {'status': 'in_progress'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        other_order = Order.objects.create(customer=self.customer_user, offer_detail=self.detail)
+        other_url = reverse('orders_api:order-detail', kwargs={'id': other_order.id})
+        stale_etag = self.client.get(other_url)['ETag']
+        self.assertTrue(other_order.transition_status(Order.STATUS_CANCELLED))
+        response = self.client.patch(other_url, {'status': 'completed'}, format='json', HTTP_IF_MATCH=stale_etag)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        other_order.refresh_from_db()
+        self.assertEqual(other_order.status, Order.STATUS_CANCELLED)
+        self.assertEqual(other_order.version, 2)
+
+    def test_same_status_is_noop(self):
+        """ Testet, dass PATCH auf den aktuellen Status ohne UPDATE 200 liefert, bei veralteter Version aber 409 """
+        url = reverse('orders_api:order-detail', kwargs={'id': self.order.id})
+        self.client.force_authenticate(user=self.business_user)
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'status': 'in_progress'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'in_progress')
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries))
+
+        response = self.client.patch(url, {'status': 'in_progress'}, format='json', HTTP_IF_MATCH='"7"')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_stale_version_loses_race(self):
+        """ Testet, dass von zwei gleichzeitigen Änderungen nur die erste gewinnt """
+        first = Order.objects.get(pk=self.order.pk)
+        second = Order.objects.get(pk=self.order.pk)
+        self.assertTrue(first.transition_status(Order.STATUS_COMPLETED))
+        self.assertFalse(second.transition_status(Order.STATUS_CANCELLED))
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_COMPLETED)
+
+
+class OrderIdempotencyTests(OrderTestCase):
+
+    def test_idempotency_key_replays_first_response(self):
+        """ Testet, dass eine Wiederholung mit gleichem Idempotency-Key die gespeicherte Antwort liefert """
+        self.client.force_authenticate(user=self.customer_user)
+        url = reverse('orders_api:order-list-create')
+        payload = {'offer_detail_id': self.detail.id}
+        first = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        order_count = Order.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            replay = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(replay.content), json.loads(first.content))
+        self.assertEqual(Order.objects.count(), order_count)
+        self.assertFalse(any('offers_app_offerdetail' in query['sql'] for query in queries))
+
+        response = self.client.post(url, {'offer_detail_id': self.detail.id + 1000}, format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        self.client.force_authenticate(user=self.business_user)
+        response = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='order-1')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_idempotency_key_released_on_error(self):
+        """ Testet, dass ein fehlgeschlagener Request seinen Idempotency-Key wieder freigibt """
+        self.client.force_authenticate(user=self.customer_user)
+        url = reverse('orders_api:order-list-create')
+        response = self.client.post(url, {}, format='json', HTTP_IDEMPOTENCY_KEY='order-2')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.filter(key='order-2').exists())
+        response = self.client.post(url, {'offer_detail_id': self.detail.id}, format='json', HTTP_IDEMPOTENCY_KEY='order-2')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0.1)
+    def test_idempotency_key_in_flight(self):
+        """ Testet, dass ein Duplikat auf einen laufenden Request wartet und danach 409 erhält """
+        self.client.force_authenticate(user=self.customer_user)
+        url = reverse('orders_api:order-list-create')
+        payload = {'offer_detail_id': self.detail.id}
+        self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='order-3')
+        # Versetzt den gespeicherten Key zurück in den Zustand "läuft noch"
+        IdempotencyKey.objects.filter(key='order-3').update(status_code=None, response_body=None)
+        order_count = Order.objects.count()
+        response = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='order-3')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Order.objects.count(), order_count)
+
+        IdempotencyKey.objects.filter(key='order-3').update(created_at=timezone.now() - timedelta(hours=1))
+        response = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='order-3')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_purge_idempotency_keys(self):
+        """ Testet, dass der Cleanup-Befehl nur abgelaufene Idempotency-Keys löscht """
+        now = timezone.now()
+        IdempotencyKey.objects.create(
+            user=self.customer_user, key='expired', request_fingerprint='x', expires_at=now - timedelta(seconds=1)
+        )
+        IdempotencyKey.objects.create(
+            user=self.customer_user, key='valid', request_fingerprint='x', expires_at=now + timedelta(hours=1)
+        )
+        call_command('purge_idempotency_keys', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['valid'])
@@ -99,6 +99,8 @@
 
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from core.image_variants import ImageVariantsField
+from core.mixins import DynamicFieldsSerializerMixin
 from ..models import Profile
 
 CustomUser = get_user_model()
@@ -136,41 +138,50 @@ class ExactProfileSerializer(serializers.ModelSerializer):
                 representation[field_name] = ""
         return representation
 
+    def validate_email(self, value):
+        """
+        Rejects an email address that belongs to another user, which the
+        unique column would otherwise turn into an IntegrityError.
+        """
+        if value is not None and self.instance is not None:
+            if CustomUser.objects.filter(email=value).exclude(pk=self.instance.user_id).exists():
+                raise serializers.ValidationError("A user with that email already exists.")
+        return value
+
     def update(self, instance, validated_data):
+        """
+        Saves changed user fields with update_fields, so the user save only
+        writes what actually changed. The dotted sources put them into
+        validated_data['user']. The profile is saved right after anyway
+        (bumping updated_at), so the user save skips the profile sync.
+        """
         profile_user = instance.user
-        user_updated = False
-        
-        user_data_from_request = {}
-        if 'first_name' in validated_data:
-            user_data_from_request['first_name'] = validated_data.pop('first_name')
-        if 'last_name' in validated_data:
-            user_data_from_request['last_name'] = validated_data.pop('last_name')
-        if 'email' in validated_data:
-            user_data_from_request['email'] = validated_data.pop('email')
-        
-        if user_data_from_request.get('first_name') is not None:
-            profile_user.first_name = user_data_from_request['first_name']
-            user_updated = True
-        if user_data_from_request.get('last_name') is not None:
-            profile_user.last_name = user_data_from_request['last_name']
-            user_updated = True
-        if user_data_from_request.get('email') is not None:
-            profile_user.email = user_data_from_request['email']
-            user_updated = True
-        
-        if user_updated:
-            profile_user.save()
-            
-        instance = super().update(instance, validated_data)
-        return instance
+        user_data = validated_data.pop('user', {})
 
-class BaseProfileListSerializer(serializers.ModelSerializer):
+        changed_user_fields = []
+        for field_name in ('first_name', 'last_name', 'email'):
+            value = user_data.get(field_name)
+            if value is not None and value != getattr(profile_user, field_name):
+                setattr(profile_user, field_name, value)
+                changed_user_fields.append(field_name)
+
+        if changed_user_fields:
+            profile_user.skip_profile_sync = True
+            try:
+                profile_user.save(update_fields=changed_user_fields)
+            finally:
+                profile_user.skip_profile_sync = False
+
+        return super().update(instance, validated_data)
+
+class BaseProfileListSerializer(DynamicFieldsSerializerMixin, serializers.ModelSerializer):
     user = serializers.IntegerField(source='user.id', read_only=True)
     username = serializers.CharField(source='user.username', read_only=True)
     first_name = serializers.CharField(source='user.first_name', read_only=True, allow_null=True)
     last_name = serializers.CharField(source='user.last_name', read_only=True, allow_null=True)
     type = serializers.CharField(source='user.type', read_only=True)
     file = serializers.ImageField(source='profile_picture', read_only=True, allow_null=True)
+    file_variants = ImageVariantsField(source='profile_picture')
     uploaded_at = serializers.DateTimeField(source='created_at', read_only=True)
     location = serializers.CharField(max_length=100, read_only=True, allow_null=True)
     tel = serializers.CharField(max_length=20, read_only=True, allow_null=True)
@@ -179,7 +190,7 @@ class BaseProfileListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Profile
-        fields = ('user', 'username', 'first_name', 'last_name', 'type', 'file', 'uploaded_at',
+        fields = ('user', 'username', 'first_name', 'last_name', 'type', 'file', 'file_variants', 'uploaded_at',
                   'location', 'tel', 'description', 'working_hours')
         read_only_fields = fields
 
@@ -196,9 +207,21 @@ class BaseProfileListSerializer(serializers.ModelSerializer):
 
 class CustomerProfileListSerializer(BaseProfileListSerializer):
     class Meta(BaseProfileListSerializer.Meta):
-          fields = ('user', 'username', 'first_name', 'last_name', 'type', 'file', 'uploaded_at')
+          fields = ('user', 'username', 'first_name', 'last_name', 'type', 'file', 'file_variants', 'uploaded_at')
 
 class BusinessProfileListSerializer(BaseProfileListSerializer):
     class Meta(BaseProfileListSerializer.Meta):
-         fields = ('user', 'username', 'first_name', 'last_name', 'type', 'file',
+         fields = ('user', 'username', 'first_name', 'last_name', 'type', 'file', 'file_variants',
                    'location', 'tel', 'description', 'working_hours')
+
+class BusinessProfileStatsSerializer(BusinessProfileListSerializer):
+    average_rating = serializers.FloatField(read_only=True, allow_null=True)
+    review_count = serializers.IntegerField(read_only=True)
+    offer_count = serializers.IntegerField(read_only=True)
+    starting_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True, allow_null=True)
+    completed_order_count = serializers.IntegerField(read_only=True)
+
+    class Meta(BusinessProfileListSerializer.Meta):
+         fields = BusinessProfileListSerializer.Meta.fields + (
+             'average_rating', 'review_count', 'offer_count', 'starting_price', 'completed_order_count'
+         )
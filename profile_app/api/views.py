@@ -1,33 +1,78 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from core.mixins import ConditionalGetMixin, FieldProjectionMixin
+from core.pagination import KeysetPagination
 from ..models import Profile
+from ..stats import annotate_business_stats
 from .serializers import (
     ExactProfileSerializer,
     CustomerProfileListSerializer,
-    BusinessProfileListSerializer
+    BusinessProfileListSerializer,
+    BusinessProfileStatsSerializer
 )
 from .permissions import IsOwnerOrReadOnly
 
-class ProfileDetailView(generics.RetrieveUpdateAPIView):
-    """Retrieves (GET) or updates (PATCH) the profile of a specific user (identified by user PK)."""
+class ProfileDetailView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
+    """
+    Retrieves (GET) or updates (PATCH) the profile of a specific user (identified by user PK).
+    GET supports conditional requests based on the profile's updated_at and the
+    user fields shown in the profile.
+    """
     queryset = Profile.objects.select_related('user').all()
     serializer_class = ExactProfileSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     lookup_field = 'user__pk'
     lookup_url_kwarg = 'pk'
 
-class CustomerProfileListView(generics.ListAPIView):
-    """Lists all profiles where the user type is 'customer'."""
+    def get_validator_values(self):
+        row = Profile.objects.filter(user__pk=self.kwargs['pk']).values_list(
+            'user_id', 'updated_at', 'user__username', 'user__first_name',
+            'user__last_name', 'user__email', 'user__type'
+        ).first()
+        if row is None:
+            return None
+        return row, row[1]
+
+class ProfileCursorPagination(KeysetPagination):
+    """Keyset pagination for profile lists, by id."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    default_ordering = ('pk',)
+
+class CustomerProfileListView(FieldProjectionMixin, generics.ListAPIView):
+    """
+    Lists all profiles where the user type is 'customer'.
+    '?fields=user,username' limits the output and the loaded columns.
+    """
     serializer_class = CustomerProfileListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ProfileCursorPagination
 
     def get_queryset(self):
-        return Profile.objects.select_related('user').filter(user__type='customer')
+        return self.project_queryset(Profile.objects.select_related('user').filter(user__type='customer'))
 
-class BusinessProfileListView(generics.ListAPIView):
-    """Lists all profiles where the user type is 'business'."""
-    serializer_class = BusinessProfileListSerializer
+class BusinessProfileListView(FieldProjectionMixin, generics.ListAPIView):
+    """
+    Lists all profiles where the user type is 'business'.
+    '?fields=user,username' limits the output and the loaded columns.
+    '?stats=true' adds each business's average rating, review count, offer
+    count, starting price and completed order count, computed by subqueries
+    in the same single query, so a directory page needs no further requests.
+    """
     permission_classes = [IsAuthenticated]
+    pagination_class = ProfileCursorPagination
+
+    def stats_requested(self):
+        return self.request.query_params.get('stats', '').lower() in ('1', 'true')
+
+    def get_serializer_class(self):
+        if self.stats_requested():
+            return BusinessProfileStatsSerializer
+        return BusinessProfileListSerializer
 
     def get_queryset(self):
-        return Profile.objects.select_related('user').filter(user__type='business')
\ No newline at end of file
+        queryset = Profile.objects.select_related('user').filter(user__type='business')
+        if self.stats_requested():
+            queryset = annotate_business_stats(queryset, self.get_serializer().fields)
+        return self.project_queryset(queryset)
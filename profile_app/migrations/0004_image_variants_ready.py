@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 20:12
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+from core.image_variants import get_variant_names
+
+
+def backfill_variants_ready(apps, schema_editor):
+    """Flags the images whose variants were already rendered before this migration."""
+    Profile = apps.get_model('profile_app', 'Profile')
+    names = (
+        Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        .values_list('profile_picture', flat=True)
+    )
+    ready = [name for name in names if all(default_storage.exists(v) for v in get_variant_names(name))]
+    Profile.objects.filter(profile_picture__in=ready).update(profile_picture_variants_ready=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_app', '0003_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='profile_picture_variants_ready',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Profile Picture Variants Ready'),
+        ),
+        migrations.RunPython(backfill_variants_ready, migrations.RunPython.noop),
+    ]
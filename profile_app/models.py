@@ -1,15 +1,20 @@
 from django.db import models
+from django.db.models import DEFERRED
+from django.utils import timezone
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-import os 
+from core.image_variants import schedule_variants
+from core.media import delete_on_commit
 class Profile(models.Model):
     """
     Represents a user's profile, extending the base User model with
     additional information like a profile picture, location, and other details.
-    It also handles the deletion of associated image files when the
-    profile picture is changed or the profile is deleted.
+    It also queues the deletion of associated image files when the
+    profile picture is changed or the profile is deleted (also by cascade,
+    see `delete_profile_picture`) and schedules resized variants of new pictures;
+    `profile_picture_variants_ready` is set once they are rendered.
     """
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -23,57 +28,86 @@ class Profile(models.Model):
         null=True,
         blank=True
     )
+    profile_picture_variants_ready = models.BooleanField(
+        _("Profile Picture Variants Ready"), default=False, editable=False
+    )
     location = models.CharField(_("Location"), max_length=100, null=True, blank=True)
     description = models.TextField(_("Description"), null=True, blank=True)
     working_hours = models.CharField(_("Working Hours"), max_length=100, null=True, blank=True)
     tel = models.CharField(_("Telephone"), max_length=20, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     __original_profile_picture = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.__original_profile_picture = self.profile_picture.name if self.profile_picture else None
+        # Read the raw column value: accessing a deferred profile_picture
+        # (e.g. in projected list queries) would cost a query per instance.
+        if 'profile_picture' in self.__dict__:
+            self.__original_profile_picture = str(self.__dict__['profile_picture'] or '') or None
+        else:
+            self.__original_profile_picture = DEFERRED
 
     def save(self, *args, **kwargs):
+        if self.__original_profile_picture is DEFERRED:
+            self.__original_profile_picture = (
+                Profile.objects.filter(pk=self.pk).values_list('profile_picture', flat=True).first() or None
+            )
         new_picture_name = self.profile_picture.name if self.profile_picture else None
-        if self.pk and new_picture_name != self.__original_profile_picture:
-            if self.__original_profile_picture:
-                old_picture_path = os.path.join(settings.MEDIA_ROOT, self.__original_profile_picture)
-                if os.path.isfile(old_picture_path):
-                    try:
-                        os.remove(old_picture_path)
-                    except OSError as e:
-                        print(f"Error deleting old profile picture {old_picture_path}: {e}")
+        picture_changed = self._state.adding or new_picture_name != self.__original_profile_picture
+        if self.pk and picture_changed:
+            delete_on_commit(self.__original_profile_picture)
+        if picture_changed:
+            self.profile_picture_variants_ready = False
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'profile_picture_variants_ready'}
 
         super().save(*args, **kwargs)
         self.__original_profile_picture = self.profile_picture.name if self.profile_picture else None
-
-    def delete(self, *args, **kwargs):
-        if self.profile_picture:
-            picture_path = os.path.join(settings.MEDIA_ROOT, self.profile_picture.name)
-            if os.path.isfile(picture_path):
-                try:
-                    os.remove(picture_path)
-                except OSError as e:
-                    print(f"Error deleting profile picture {picture_path}: {e}")
-        super().delete(*args, **kwargs)
+        if picture_changed:
+            schedule_variants(self.__original_profile_picture, on_ready=mark_picture_variants_ready)
 
     def __str__(self):
         return f"Profile of {self.user.username}"
 
 
+def mark_picture_variants_ready(name):
+    """
+    Records that the variants of the profile picture `name` are rendered and
+    bumps updated_at, so the profile's cached representations change too.
+    """
+    for profile in Profile.objects.filter(profile_picture=name, profile_picture_variants_ready=False):
+        profile.profile_picture_variants_ready = True
+        profile.save(update_fields=['profile_picture_variants_ready', 'updated_at'])
+
+
+@receiver(post_delete, sender=Profile)
+def delete_profile_picture(sender, instance, **kwargs):
+    """
+    Signal receiver to queue the picture of a deleted profile for removal.
+    Runs for cascaded deletes (e.g. of the user) too, which skip Profile.delete().
+    """
+    if instance.profile_picture:
+        delete_on_commit(instance.profile_picture.name)
+
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+def create_or_sync_user_profile(sender, instance, created, update_fields=None, **kwargs):
     """
-    Signal receiver to create a Profile when a new User is created,
-    and to ensure the Profile is saved when an existing User is saved.
+    Signal receiver to create a Profile when a new User is created. For an
+    existing User, the profile's updated_at (its Last-Modified) is only
+    bumped, with a single UPDATE, when a user field shown in the profile
+    actually changed; other saves (e.g. last_login or password updates)
+    cost no profile query at all. Callers that save the profile in the same
+    operation (the profile PATCH) set `skip_profile_sync` on the user.
     """
     if created:
         Profile.objects.create(user=instance)
-    else:
-        try:
-            instance.profile.save()
-        except Profile.DoesNotExist:
-            Profile.objects.create(user=instance)
-
+        return
+    if getattr(instance, 'skip_profile_sync', False):
+        return
+    if not instance.get_changed_profile_fields(update_fields):
+        return
+    if not Profile.objects.filter(user=instance).update(updated_at=timezone.now()):
+        Profile.objects.create(user=instance)
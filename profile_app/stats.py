@@ -0,0 +1,47 @@
+from django.db.models import Count, FloatField, Min, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce, Round
+
+from offers_app.models import Offer
+from orders_app.models import Order
+from reviews_app.models import BusinessRatingSummary
+
+BUSINESS_STATS_FIELDS = (
+    'average_rating', 'review_count', 'offer_count', 'starting_price', 'completed_order_count',
+)
+
+
+def get_business_stats_annotations():
+    """
+    Returns the directory card statistics of a business profile as
+    correlated subqueries on the profile's user_id. Each one reads a single
+    index range: the user's rating summary row, the user's offers, and the
+    user's completed orders (order_provider_status_idx).
+    """
+    summaries = BusinessRatingSummary.objects.filter(business_user_id=OuterRef('user_id'))
+    offers = Offer.objects.filter(user_id=OuterRef('user_id')).order_by().values('user_id')
+    completed_orders = (
+        Order.objects.filter(business_user_id=OuterRef('user_id'), status=Order.STATUS_COMPLETED)
+        .order_by().values('business_user_id')
+    )
+    return {
+        'average_rating': Subquery(
+            summaries.filter(review_count__gt=0).values(
+                average=Round(Cast('rating_sum', FloatField()) / Cast('review_count', FloatField()), 1)
+            )
+        ),
+        'review_count': Coalesce(Subquery(summaries.values('review_count')), 0),
+        'offer_count': Coalesce(Subquery(offers.annotate(count=Count('pk')).values('count')), 0),
+        'starting_price': Subquery(offers.annotate(price=Min('min_price')).values('price')),
+        'completed_order_count': Coalesce(
+            Subquery(completed_orders.annotate(count=Count('pk')).values('count')), 0
+        ),
+    }
+
+
+def annotate_business_stats(queryset, fields=BUSINESS_STATS_FIELDS):
+    """
+    Adds the statistics named in `fields` to a Profile queryset; all of them
+    are computed within the queryset's own SQL statement.
+    """
+    annotations = get_business_stats_annotations()
+    return queryset.annotate(**{name: annotations[name] for name in BUSINESS_STATS_FIELDS if name in fields})
@@ -4,7 +4,13 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from .models import Profile
+from offers_app.models import Offer, OfferDetail
+from orders_app.models import Order
+from reviews_app.models import Review
 
 CustomUser = get_user_model()
 
@@ -147,13 +153,43 @@ class ProfileDetailAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('email', response.data)
 
+    def test_patch_own_profile_duplicate_email(self):
+        """ Testet, dass eine bereits vergebene E-Mail-Adresse 400 statt eines Serverfehlers liefert """
+        self.client.force_authenticate(user=self.user_a)
+        response = self.client.patch(self.detail_url_user_a, {"email": self.user_b.email}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.data)
+
+        response = self.client.patch(self.detail_url_user_a, {"email": self.user_a.email}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_profile_conditional_not_modified(self):
+        """ Testet, dass ein unveränderter Abruf mit If-None-Match 304 liefert """
+        self.client.force_authenticate(user=self.user_b)
+        response = self.client.get(self.detail_url_user_a)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url_user_a, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_profile_conditional_changed(self):
+        """ Testet, dass sich das ETag nach einer Änderung von Benutzerdaten ändert """
+        self.client.force_authenticate(user=self.user_b)
+        etag = self.client.get(self.detail_url_user_a)['ETag']
+        CustomUser.objects.filter(pk=self.user_a.pk).update(first_name='Neu')
+        response = self.client.get(self.detail_url_user_a, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Neu')
+
     def test_get_customer_list_success(self):
         self.client.force_authenticate(user=self.user_a)
         response = self.client.get(self.customer_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertEqual(len(response.data), 1)
-        customer_data = response.data[0]
+        self.assertEqual(len(response.data['results']), 1)
+        customer_data = response.data['results'][0]
 
         # --- KORRIGIERTE ASSERTIONS für Liste ---
         self.assertIn('user', customer_data)
@@ -175,12 +211,11 @@ class ProfileDetailAPITests(APITestCase):
         self.client.force_authenticate(user=self.user_a)
         response = self.client.get(self.business_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
         business_data_a = None
         business_data_other = None
-        for item in response.data:
+        for item in response.data['results']:
              # --- KORRIGIERTE ASSERTIONS für Liste ---
             self.assertIn('user', item)
             self.assertIsInstance(item['user'], int) # Erwarte Integer ID
@@ -211,4 +246,204 @@ class ProfileDetailAPITests(APITestCase):
         self.assertIn('type', business_data_a)
         self.assertEqual(business_data_a['type'], 'business')
         # uploaded_at sollte hier NICHT sein
-        self.assertNotIn('uploaded_at', business_data_a)
\ No newline at end of file
+        self.assertNotIn('uploaded_at', business_data_a)
+
+
+class ProfileListProjectionTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_users = [
+            CustomUser.objects.create_user(
+                username=f'roster_biz{i}', password='password123', email=f'roster_biz{i}@example.com',
+                type='business'
+            )
+            for i in range(5)
+        ]
+        Profile.objects.filter(user__in=cls.business_users).update(description="Lange Beschreibung " * 50)
+        cls.customer = CustomUser.objects.create_user(
+            username='roster_customer', password='password123', email='roster_customer@example.com', type='customer'
+        )
+        cls.business_list_url = reverse('profile_api:business-profile-list')
+        cls.customer_list_url = reverse('profile_api:customer-profile-list')
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.customer)
+
+    def test_fields_projection(self):
+        """ Testet, dass ?fields= die Ausgabe und die geladenen Spalten einschränkt """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.business_list_url, {'fields': 'user,username'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(set(response.data['results'][0].keys()), {'user', 'username'})
+        sql = queries[-1]['sql']
+        self.assertIn('"username"', sql)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"password"', sql)
+
+        response = self.client.get(self.customer_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('uploaded_at', response.data['results'][0])
+
+        response = self.client.get(self.business_list_url, {'fields': 'user,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+    def test_cursor_pagination(self):
+        """ Testet die Cursor-Paginierung der Profillisten """
+        ids = []
+        response = self.client.get(self.business_list_url, {'page_size': 2, 'fields': 'user'})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids.extend(item['user'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(ids, [user.id for user in self.business_users])
+
+
+class ProfileSyncSignalTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='sync_user', password='password123', email='sync_user@example.com', type='business'
+        )
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(pk=self.user.pk)
+
+    def test_user_saves_without_profile_changes(self):
+        """ Testet, dass Speichern ohne geänderte Profilfelder keine Profil-Abfrage auslöst """
+        self.user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(1):
+            self.user.save()
+        self.user.first_name = 'Nicht gespeichert'
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_changed_profile_field_bumps_updated_at(self):
+        """ Testet, dass eine geänderte Namensangabe updated_at des Profils mit einem UPDATE erhöht """
+        updated_at = Profile.objects.get(user=self.user).updated_at
+        self.user.first_name = 'Neu'
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(len([sql for sql in updates if 'UPDATE "profile_app_profile"' in sql]), 1)
+        self.assertGreater(Profile.objects.get(user=self.user).updated_at, updated_at)
+        with self.assertNumQueries(1):
+            self.user.save()
+
+    def test_patch_profile_saves_only_changed_user_fields(self):
+        """ Testet, dass PATCH den Benutzer nur bei geänderten Benutzerfeldern speichert """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('profile_api:profile-detail', kwargs={'pk': self.user.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'email': self.user.email, 'tel': '123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('UPDATE "user_auth_app_customuser"' in query['sql'] for query in queries))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'last_name': 'Neu'}, format='json')
+        user_updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "user_auth_app_customuser"')]
+        self.assertEqual(len(user_updates), 1)
+        self.assertNotIn('"password"', user_updates[0])
+        self.assertEqual(response.data['last_name'], 'Neu')
+
+    def test_patch_profile_updates_profile_once(self):
+        """ Testet, dass PATCH mit geänderten Benutzerfeldern das Profil nur einmal aktualisiert """
+        self.client.force_authenticate(user=self.user)
+        url = reverse('profile_api:profile-detail', kwargs={'pk': self.user.pk})
+        updated_at = Profile.objects.get(user=self.user).updated_at
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'first_name': 'Neu', 'email': 'neu@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "profile_app_profile"')]
+        self.assertEqual(len(profile_updates), 1)
+        self.assertGreater(Profile.objects.get(user=self.user).updated_at, updated_at)
+
+    def test_bulk_create_users_creates_profiles(self):
+        """ Testet, dass beim Massenanlegen von Benutzern die Profile gesammelt angelegt werden """
+        users = [
+            CustomUser(username=f'bulk_user{i}', email=f'bulk_user{i}@example.com', type='customer')
+            for i in range(3)
+        ]
+        with self.assertNumQueries(4):
+            CustomUser.objects.bulk_create(users)
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+
+
+class BusinessDirectoryStatsTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_user = CustomUser.objects.create_user(
+            username='directory_biz', password='password123', email='directory_biz@example.com', type='business'
+        )
+        cls.empty_business_user = CustomUser.objects.create_user(
+            username='directory_empty', password='password123', email='directory_empty@example.com', type='business'
+        )
+        cls.customers = [
+            CustomUser.objects.create_user(
+                username=f'directory_c{i}', password='password123', email=f'directory_c{i}@example.com',
+                type='customer'
+            )
+            for i in range(2)
+        ]
+        for price in (80, 30):
+            offer = Offer.objects.create(user=cls.business_user, title=f"Angebot {price}")
+            detail = OfferDetail.objects.create(
+                offer=offer, title="Basic", price=price, delivery_time_in_days=3, revisions=1, offer_type='basic'
+            )
+        Order.objects.create(customer=cls.customers[0], offer_detail=detail, status=Order.STATUS_COMPLETED)
+        Order.objects.create(customer=cls.customers[1], offer_detail=detail)
+        Review.objects.create(reviewer=cls.customers[0], reviewed_user=cls.business_user, rating=5)
+        Review.objects.create(reviewer=cls.customers[1], reviewed_user=cls.business_user, rating=4)
+        cls.business_list_url = reverse('profile_api:business-profile-list')
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.customers[0])
+
+    def test_stats_in_single_query(self):
+        """ Testet, dass die Verzeichnis-Statistiken mit genau einer Abfrage geliefert werden """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.business_list_url, {'stats': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len([query for query in queries if 'profile_app_profile' in query['sql']]), 1)
+        self.assertEqual(len(queries), 1)
+
+        cards = {item['user']: item for item in response.data['results']}
+        card = cards[self.business_user.id]
+        self.assertEqual(card['average_rating'], 4.5)
+        self.assertEqual(card['review_count'], 2)
+        self.assertEqual(card['offer_count'], 2)
+        self.assertEqual(card['starting_price'], '30.00')
+        self.assertEqual(card['completed_order_count'], 1)
+        self.assertIn('location', card)
+
+        empty_card = cards[self.empty_business_user.id]
+        self.assertIsNone(empty_card['average_rating'])
+        self.assertEqual(empty_card['review_count'], 0)
+        self.assertEqual(empty_card['offer_count'], 0)
+        self.assertIsNone(empty_card['starting_price'])
+        self.assertEqual(empty_card['completed_order_count'], 0)
+
+        response = self.client.get(self.business_list_url)
+        self.assertNotIn('review_count', response.data['results'][0])
+
+    def test_stats_with_projection_and_cursor(self):
+        """ Testet Statistiken zusammen mit ?fields= und Cursor-Paginierung """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.business_list_url, {'stats': '1', 'fields': 'user,offer_count', 'page_size': 1}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'user': self.business_user.id, 'offer_count': 2}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('reviews_app_businessratingsummary', queries[0]['sql'])
+        self.assertNotIn('"description"', queries[0]['sql'])
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 from django.core.validators import MinValueValidator, MaxValueValidator
-from ..models import Review 
+from ..models import BusinessRatingSummary, Review
 
 CustomUser = get_user_model()
 
@@ -99,3 +99,18 @@ class ReviewUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ('rating', 'description')
+
+
+class BusinessRatingSummarySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the rating summary of a business user.
+    The histogram maps each star rating (1-5) to its number of reviews.
+    """
+    business_user = serializers.IntegerField(source='business_user_id', read_only=True)
+    average_rating = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = BusinessRatingSummary
+        fields = ('business_user', 'review_count', 'average_rating', 'histogram')
+        read_only_fields = fields
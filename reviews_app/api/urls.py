@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import ReviewListCreateView, ReviewDetailView
+from .views import ReviewListCreateView, ReviewDetailView, BusinessRatingSummaryView
 
 app_name = 'reviews_api'
 
 urlpatterns = [
     path('reviews/', ReviewListCreateView.as_view(), name='review-list-create'),
     path('reviews/<int:id>/', ReviewDetailView.as_view(), name='review-detail'),
+    path('reviews/summary/<int:business_user_id>/', BusinessRatingSummaryView.as_view(), name='review-summary'),
 ]
\ No newline at end of file
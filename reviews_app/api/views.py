@@ -1,24 +1,37 @@
-from rest_framework import generics, filters, status
+from rest_framework import generics, filters, status, views
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
-from ..models import Review
+from core.pagination import KeysetPagination
+from ..models import BusinessRatingSummary, Review
 from .serializers import (
     ReviewListSerializer,
     ReviewCreateSerializer,
     ReviewDetailSerializer,
-    ReviewUpdateSerializer
+    ReviewUpdateSerializer,
+    BusinessRatingSummarySerializer
 )
 from .permissions import IsCustomerUser, IsReviewOwner
 from .filters import ReviewFilter
 
+class ReviewCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for the review list, keyed on the active ordering
+    ('created_at' or 'rating') plus id.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    default_ordering = ('-created_at',)
+
 class ReviewListCreateView(generics.ListCreateAPIView):
     """Lists reviews (GET, with filtering/ordering) or creates a new review (POST)."""
     queryset = Review.objects.select_related('reviewer', 'reviewed_user').all()
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_class = ReviewFilter
     ordering_fields = ['created_at', 'rating']
+    pagination_class = ReviewCursorPagination
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -67,4 +80,17 @@ class ReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Response(response_serializer.data)
 
     def perform_update(self, serializer):
-        serializer.save()
\ No newline at end of file
+        serializer.save()
+
+class BusinessRatingSummaryView(views.APIView):
+    """
+    Returns review count, average rating and star histogram of a business
+    user, read from its rating summary row instead of aggregating reviews.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, business_user_id, *args, **kwargs):
+        summary = BusinessRatingSummary.objects.filter(business_user_id=business_user_id).first()
+        if summary is None:
+            summary = BusinessRatingSummary(business_user_id=business_user_id)
+        return Response(BusinessRatingSummarySerializer(summary).data)
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews_app.models import BusinessRatingSummary
+
+SUMMARY_FIELDS = ['review_count', 'rating_sum'] + [
+    BusinessRatingSummary.histogram_field(rating) for rating in BusinessRatingSummary.RATINGS
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-business rating summaries from the Review table, "
+        "reports every summary that differs and replaces all of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report differences and exit with an error if there are any; change nothing."
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = BusinessRatingSummary.compute_all()
+            stored = {
+                summary.business_user_id: summary
+                for summary in BusinessRatingSummary.objects.select_for_update()
+            }
+
+            mismatches = 0
+            for business_user_id in sorted(expected.keys() | stored.keys()):
+                expected_values = self.get_values(expected.get(business_user_id))
+                stored_values = self.get_values(stored.get(business_user_id))
+                if expected_values != stored_values:
+                    mismatches += 1
+                    self.stdout.write(
+                        f"User {business_user_id}: stored {stored_values}, expected {expected_values}"
+                    )
+
+            if options['check']:
+                if mismatches:
+                    raise CommandError(f"{mismatches} rating summaries are out of date.")
+                self.stdout.write(self.style.SUCCESS("All rating summaries are up to date."))
+                return
+
+            BusinessRatingSummary.objects.all().delete()
+            BusinessRatingSummary.objects.bulk_create(expected.values())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(expected)} rating summaries ({mismatches} were out of date)."
+        ))
+
+    def get_values(self, summary):
+        if summary is None:
+            summary = BusinessRatingSummary()
+        return {field_name: getattr(summary, field_name) for field_name in SUMMARY_FIELDS}
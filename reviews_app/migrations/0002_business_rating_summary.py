@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-18 21:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_rating_summaries(apps, schema_editor):
+    Review = apps.get_model('reviews_app', 'Review')
+    BusinessRatingSummary = apps.get_model('reviews_app', 'BusinessRatingSummary')
+    summaries = {}
+    rows = Review.objects.order_by().values('reviewed_user_id', 'rating').annotate(count=Count('id'))
+    for row in rows:
+        summary = summaries.setdefault(
+            row['reviewed_user_id'], BusinessRatingSummary(business_user_id=row['reviewed_user_id'])
+        )
+        summary.review_count += row['count']
+        summary.rating_sum += row['count'] * row['rating']
+        if 1 <= row['rating'] <= 5:
+            field_name = f"rating_{row['rating']}_count"
+            setattr(summary, field_name, getattr(summary, field_name) + row['count'])
+    BusinessRatingSummary.objects.bulk_create(summaries.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews_app', '0001_initial'),
+        ('user_auth_app', '0003_alter_customuser_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessRatingSummary',
+            fields=[
+                ('business_user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Business User')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Review Count')),
+                ('rating_sum', models.PositiveIntegerField(default=0, verbose_name='Rating Sum')),
+                ('rating_1_count', models.PositiveIntegerField(default=0, verbose_name='1 Star Reviews')),
+                ('rating_2_count', models.PositiveIntegerField(default=0, verbose_name='2 Star Reviews')),
+                ('rating_3_count', models.PositiveIntegerField(default=0, verbose_name='3 Star Reviews')),
+                ('rating_4_count', models.PositiveIntegerField(default=0, verbose_name='4 Star Reviews')),
+                ('rating_5_count', models.PositiveIntegerField(default=0, verbose_name='5 Star Reviews')),
+            ],
+        ),
+        migrations.RunPython(backfill_rating_summaries, migrations.RunPython.noop),
+    ]
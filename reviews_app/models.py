@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -14,14 +17,16 @@ class Review(models.Model):
         on_delete=models.CASCADE,
         related_name='reviews_given',
         verbose_name=_("Reviewer (Customer)"),
-        limit_choices_to={'type': 'customer'}
+        limit_choices_to={'type': 'customer'},
+        db_index=False
     )
     reviewed_user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='reviews_received',
         verbose_name=_("Reviewed User (Business)"),
-        limit_choices_to={'type': 'business'}
+        limit_choices_to={'type': 'business'},
+        db_index=False
     )
     rating = models.IntegerField(
         _("Rating"),
@@ -33,9 +38,149 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Lead with the reviewed user/reviewer columns (which replaces their
+        # single column FK indexes), so a filtered list ordered by created_at
+        # or rating reads one index range; the id tiebreaker of the keyset
+        # pagination is covered by the rowid every SQLite index ends with.
+        indexes = [
+            models.Index(fields=['reviewed_user', 'created_at'], name='review_reviewed_created_idx'),
+            models.Index(fields=['reviewed_user', 'rating'], name='review_reviewed_rating_idx'),
+            models.Index(fields=['reviewer', 'created_at'], name='review_reviewer_created_idx'),
+            models.Index(fields=['created_at'], name='review_created_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(fields=['reviewer', 'reviewed_user'], name='unique_review_per_user_pair')
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded_reviewed_user_id = self.__dict__.get('reviewed_user_id')
+        self.loaded_rating = self.__dict__.get('rating')
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the review and moves its rating between the rating summaries in
+        the same transaction, so the summaries never disagree with the reviews.
+        """
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                BusinessRatingSummary.apply_change(self.reviewed_user_id, add_rating=self.rating)
+            elif (self.reviewed_user_id, self.rating) != (self.loaded_reviewed_user_id, self.loaded_rating):
+                BusinessRatingSummary.apply_change(self.loaded_reviewed_user_id, remove_rating=self.loaded_rating)
+                BusinessRatingSummary.apply_change(self.reviewed_user_id, add_rating=self.rating)
+        self.loaded_reviewed_user_id = self.reviewed_user_id
+        self.loaded_rating = self.rating
+
     def __str__(self):
         return f"Review by {self.reviewer.username} for {self.reviewed_user.username} ({self.rating} stars)"
+
+
+
+class BusinessRatingSummary(models.Model):
+    """
+    Running rating totals of one business user: the number of reviews, the
+    sum of their ratings and how many reviews gave each of 1 to 5 stars.
+
+    Kept up to date by Review.save() and the post_delete receiver below, so
+    averages and histograms are read from a single row instead of
+    aggregating the reviews. Writes that bypass both (queryset update(),
+    raw SQL) are repaired by `python manage.py rebuild_rating_summaries`.
+    """
+    business_user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_summary',
+        verbose_name=_("Business User")
+    )
+    review_count = models.PositiveIntegerField(_("Review Count"), default=0)
+    rating_sum = models.PositiveIntegerField(_("Rating Sum"), default=0)
+    rating_1_count = models.PositiveIntegerField(_("1 Star Reviews"), default=0)
+    rating_2_count = models.PositiveIntegerField(_("2 Star Reviews"), default=0)
+    rating_3_count = models.PositiveIntegerField(_("3 Star Reviews"), default=0)
+    rating_4_count = models.PositiveIntegerField(_("4 Star Reviews"), default=0)
+    rating_5_count = models.PositiveIntegerField(_("5 Star Reviews"), default=0)
+
+    RATINGS = (1, 2, 3, 4, 5)
+
+    @staticmethod
+    def histogram_field(rating):
+        return f'rating_{rating}_count'
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 1)
+
+    @property
+    def histogram(self):
+        return {rating: getattr(self, self.histogram_field(rating)) for rating in self.RATINGS}
+
+    @classmethod
+    def apply_change(cls, business_user_id, add_rating=None, remove_rating=None):
+        """
+        Adds and/or removes one review with the given rating from the summary
+        of `business_user_id` with a single UPDATE of F() expressions, so
+        concurrent changes never overwrite each other. The row is created on
+        the first added review; removals never create one, because they also
+        run while the business user itself is being deleted.
+        """
+        changes = {}
+        for rating, delta in ((add_rating, 1), (remove_rating, -1)):
+            if rating is None:
+                continue
+            changes['review_count'] = changes.get('review_count', 0) + delta
+            changes['rating_sum'] = changes.get('rating_sum', 0) + delta * rating
+            if rating in cls.RATINGS:
+                field_name = cls.histogram_field(rating)
+                changes[field_name] = changes.get(field_name, 0) + delta
+        changes = {field_name: delta for field_name, delta in changes.items() if delta}
+        if not changes:
+            return
+
+        update = {field_name: F(field_name) + delta for field_name, delta in changes.items()}
+        if cls.objects.filter(business_user_id=business_user_id).update(**update) or add_rating is None:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(business_user_id=business_user_id, **changes)
+        except IntegrityError:
+            # Another transaction created the row in the meantime.
+            cls.objects.filter(business_user_id=business_user_id).update(**update)
+
+    @classmethod
+    def compute_all(cls):
+        """
+        Builds unsaved summaries for every reviewed business user from the
+        Review table with a single grouped query.
+        """
+        summaries = {}
+        rows = (
+            Review.objects.order_by()
+            .values('reviewed_user_id', 'rating')
+            .annotate(count=models.Count('id'))
+        )
+        for row in rows:
+            summary = summaries.setdefault(row['reviewed_user_id'], cls(business_user_id=row['reviewed_user_id']))
+            summary.review_count += row['count']
+            summary.rating_sum += row['count'] * row['rating']
+            if row['rating'] in cls.RATINGS:
+                field_name = cls.histogram_field(row['rating'])
+                setattr(summary, field_name, getattr(summary, field_name) + row['count'])
+        return summaries
+
+    def __str__(self):
+        return f"Rating summary of user {self.business_user_id} ({self.review_count} reviews)"
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating_summary(sender, instance, **kwargs):
+    """
+    Signal receiver to take a deleted review out of its business user's
+    rating summary. Runs inside the deletion's transaction, also for
+    cascaded and queryset deletes, which skip Review.delete().
+    """
+    BusinessRatingSummary.apply_change(instance.loaded_reviewed_user_id, remove_rating=instance.loaded_rating)
@@ -1,12 +1,17 @@
 # reviews_app/tests.py
 
+import io
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 # Passe ggf. den Importpfad für die Modelle an
-from .models import Review
+from .models import BusinessRatingSummary, Review
+from .api.views import ReviewCursorPagination
 # Stelle sicher, dass das CustomUser Model importiert wird
 # from user_auth_app.models import CustomUser # Oder: CustomUser = get_user_model()
 
@@ -73,9 +78,9 @@ class ReviewAPITests(APITestCase):
         self.client.force_authenticate(user=self.customer_user1)
         response = self.client.get(self.list_create_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3) # 3 Reviews erstellt
+        self.assertEqual(len(response.data['results']), 3) # 3 Reviews erstellt
         # Prüfe Struktur eines Eintrags (flach, ReviewListSerializer)
-        review_data = response.data[0] # Nimm den neuesten (höchste ID oder ordering)
+        review_data = response.data['results'][0] # Nimm den neuesten (höchste ID oder ordering)
         expected_keys = {
             'id', 'business_user', 'reviewer', 'rating', 'description',
             'created_at', 'updated_at'
@@ -90,34 +95,34 @@ class ReviewAPITests(APITestCase):
         self.client.force_authenticate(user=self.customer_user1)
         response = self.client.get(self.list_create_url, {'business_user_id': self.business_user1.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2) # R1 und R2 bewerten B1
-        self.assertTrue(all(item['business_user'] == self.business_user1.id for item in response.data))
+        self.assertEqual(len(response.data['results']), 2) # R1 und R2 bewerten B1
+        self.assertTrue(all(item['business_user'] == self.business_user1.id for item in response.data['results']))
 
     def test_list_reviews_filter_reviewer_id(self):
         """ Test: Filtern nach reviewer_id """
         self.client.force_authenticate(user=self.customer_user1)
         response = self.client.get(self.list_create_url, {'reviewer_id': self.customer_user1.id})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2) # R1 und R3 sind von C1
-        self.assertTrue(all(item['reviewer'] == self.customer_user1.id for item in response.data))
+        self.assertEqual(len(response.data['results']), 2) # R1 und R3 sind von C1
+        self.assertTrue(all(item['reviewer'] == self.customer_user1.id for item in response.data['results']))
 
     def test_list_reviews_filter_rating(self):
         """ Test: Filtern nach rating """
         self.client.force_authenticate(user=self.customer_user1)
         response = self.client.get(self.list_create_url, {'rating': 5})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1) # Nur R1 hat Rating 5
-        self.assertEqual(response.data[0]['id'], self.review1.id)
+        self.assertEqual(len(response.data['results']), 1) # Nur R1 hat Rating 5
+        self.assertEqual(response.data['results'][0]['id'], self.review1.id)
 
     def test_list_reviews_ordering_rating(self):
         """ Test: Sortieren nach Rating (absteigend) """
         self.client.force_authenticate(user=self.customer_user1)
         response = self.client.get(self.list_create_url, {'ordering': '-rating'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
-        self.assertEqual(response.data[0]['id'], self.review1.id) # Rating 5
-        self.assertEqual(response.data[1]['id'], self.review3.id) # Rating 4
-        self.assertEqual(response.data[2]['id'], self.review2.id) # Rating 3
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['results'][0]['id'], self.review1.id) # Rating 5
+        self.assertEqual(response.data['results'][1]['id'], self.review3.id) # Rating 4
+        self.assertEqual(response.data['results'][2]['id'], self.review2.id) # Rating 3
 
     # === POST /api/reviews/ Tests ===
 
@@ -313,4 +318,158 @@ class ReviewAPITests(APITestCase):
         """ Test: Löschen einer nicht existierenden Review (404) """
         self.client.force_authenticate(user=self.customer_user1)
         response = self.client.delete(self.review_non_existent_url)
-        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ReviewRatingSummaryTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_user = CustomUser.objects.create_user(
+            username='summary_provider', password='password123', email='summary_provider@example.com', type='business'
+        )
+        cls.other_business_user = CustomUser.objects.create_user(
+            username='summary_other', password='password123', email='summary_other@example.com', type='business'
+        )
+        cls.customer_user = CustomUser.objects.create_user(
+            username='summary_customer', password='password123', email='summary_customer@example.com', type='customer'
+        )
+        cls.other_customer = CustomUser.objects.create_user(
+            username='summary_customer2', password='password123', email='summary_customer2@example.com', type='customer'
+        )
+        cls.review = Review.objects.create(reviewer=cls.other_customer, reviewed_user=cls.business_user, rating=2)
+
+    def get_summary(self, user):
+        return BusinessRatingSummary.objects.get(business_user=user)
+
+    def test_summary_follows_api_writes(self):
+        """ Testet, dass Erstellen, Ändern und Löschen über die API die Zusammenfassung aktualisieren """
+        self.client.force_authenticate(user=self.customer_user)
+        response = self.client.post(
+            reverse('reviews_api:review-list-create'),
+            {'business_user': self.business_user.id, 'rating': 5, 'description': 'Top'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        summary = self.get_summary(self.business_user)
+        self.assertEqual((summary.review_count, summary.rating_sum), (2, 7))
+        self.assertEqual(summary.histogram, {1: 0, 2: 1, 3: 0, 4: 0, 5: 1})
+        self.assertEqual(summary.average_rating, 3.5)
+
+        url = reverse('reviews_api:review-detail', kwargs={'id': response.data['id']})
+        response = self.client.patch(url, {'rating': 4}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = self.get_summary(self.business_user)
+        self.assertEqual((summary.review_count, summary.rating_sum), (2, 6))
+        self.assertEqual(summary.histogram, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0})
+
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        summary = self.get_summary(self.business_user)
+        self.assertEqual((summary.review_count, summary.rating_sum), (1, 2))
+        self.assertEqual(summary.histogram, {1: 0, 2: 1, 3: 0, 4: 0, 5: 0})
+
+    def test_summary_follows_model_writes(self):
+        """ Testet Wechsel des bewerteten Users, Queryset-Löschen und Löschen des Business Users """
+        self.review.reviewed_user = self.other_business_user
+        self.review.save()
+        self.assertEqual(self.get_summary(self.business_user).review_count, 0)
+        self.assertEqual(self.get_summary(self.other_business_user).rating_2_count, 1)
+
+        Review.objects.filter(reviewed_user=self.other_business_user).delete()
+        self.assertEqual(self.get_summary(self.other_business_user).review_count, 0)
+
+        Review.objects.create(reviewer=self.customer_user, reviewed_user=self.other_business_user, rating=3)
+        self.other_business_user.delete()
+        self.assertFalse(BusinessRatingSummary.objects.filter(business_user_id=self.other_business_user.id).exists())
+
+    def test_summary_endpoint_single_lookup(self):
+        """ Testet, dass Durchschnitt und Histogramm mit einer Abfrage gelesen werden """
+        self.client.force_authenticate(user=self.customer_user)
+        url = reverse('reviews_api:review-summary', kwargs={'business_user_id': self.business_user.id})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['review_count'], 1)
+        self.assertEqual(response.data['average_rating'], 2.0)
+        self.assertEqual(response.data['histogram'], {'1': 0, '2': 1, '3': 0, '4': 0, '5': 0})
+
+        response = self.client.get(reverse('reviews_api:review-summary', kwargs={'business_user_id': self.other_business_user.id}))
+        self.assertEqual(response.data['review_count'], 0)
+        self.assertIsNone(response.data['average_rating'])
+
+    def test_rebuild_rating_summaries(self):
+        """ Testet, dass der Befehl veraltete Zusammenfassungen erkennt und neu aufbaut """
+        call_command('rebuild_rating_summaries', check=True, stdout=io.StringIO())
+        Review.objects.filter(pk=self.review.pk).update(rating=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rating_summaries', check=True, stdout=io.StringIO())
+        self.assertEqual(self.get_summary(self.business_user).rating_sum, 2)
+
+        call_command('rebuild_rating_summaries', stdout=io.StringIO())
+        summary = self.get_summary(self.business_user)
+        self.assertEqual((summary.review_count, summary.rating_sum, summary.rating_5_count), (1, 5, 1))
+        call_command('rebuild_rating_summaries', check=True, stdout=io.StringIO())
+
+
+class ReviewCursorPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business_user = CustomUser.objects.create_user(
+            username='cursor_provider', password='password123', email='cursor_provider@example.com', type='business'
+        )
+        cls.customers = [
+            CustomUser.objects.create_user(
+                username=f'cursor_customer{i}', password='password123', email=f'cursor_customer{i}@example.com',
+                type='customer'
+            )
+            for i in range(7)
+        ]
+        for i, customer in enumerate(cls.customers):
+            Review.objects.create(reviewer=customer, reviewed_user=cls.business_user, rating=i % 3 + 1)
+        cls.list_url = reverse('reviews_api:review-list-create')
+
+    def collect_pages(self, params):
+        ids = []
+        response = self.client.get(self.list_url, {**params, 'page_size': 3})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_pages_follow_ordering(self):
+        """ Testet die Cursor-Paginierung nach Erstellungsdatum und nach Bewertung """
+        self.client.force_authenticate(user=self.customers[0])
+        reviews = Review.objects.filter(reviewed_user=self.business_user)
+        self.assertEqual(
+            self.collect_pages({'business_user_id': self.business_user.id}),
+            list(reviews.order_by('-created_at', '-id').values_list('id', flat=True))
+        )
+        self.assertEqual(
+            self.collect_pages({'business_user_id': self.business_user.id, 'ordering': '-rating'}),
+            list(reviews.order_by('-rating', '-id').values_list('id', flat=True))
+        )
+        self.assertEqual(
+            self.collect_pages({'ordering': 'rating'}),
+            list(Review.objects.order_by('rating', 'id').values_list('id', flat=True))
+        )
+
+        with mock.patch.object(ReviewCursorPagination, 'max_page_size', 5):
+            response = self.client.get(self.list_url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_filtered_ordering_uses_index(self):
+        """ Testet, dass Filter plus Sortierung einen Index-Bereich ohne Sortierschritt liest """
+        by_rating = Review.objects.filter(reviewed_user=self.business_user).order_by('-rating', '-id')[:21]
+        plan = by_rating.explain()
+        self.assertIn('review_reviewed_rating_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+        by_date = Review.objects.filter(reviewer=self.customers[0]).order_by('-created_at', '-id')[:21]
+        plan = by_date.explain()
+        self.assertIn('review_reviewer_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 22:04
+
+import user_auth_app.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0003_alter_customuser_email'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', user_auth_app.models.CustomUserManager()),
+            ],
+        ),
+    ]
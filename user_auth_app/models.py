@@ -1,15 +1,44 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.apps import apps
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
+
+class CustomUserManager(UserManager):
+    """
+    Manager, der beim Massenanlegen von Benutzern auch deren Profile gesammelt
+    anlegt und die Plattform-Statistik anpasst (bulk_create sendet kein
+    post_save-Signal).
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from base_info_app import stats
+
+        with transaction.atomic(using=self.db):
+            users = super().bulk_create(objs, *args, **kwargs)
+            created_users = [user for user in users if user.pk is not None]
+            Profile = apps.get_model('profile_app', 'Profile')
+            Profile.objects.bulk_create(
+                [Profile(user_id=user.pk) for user in created_users],
+                ignore_conflicts=True
+            )
+            stats.apply_delta(business_profile_count=sum(user.type == 'business' for user in created_users))
+        return users
+
+
 class CustomUser(AbstractUser):
     """
     Erweitertes Benutzermodell mit Unterscheidung nach Typ.
+    Merkt sich die geladenen Werte der im Profil angezeigten Felder, damit
+    Signal-Empfänger nur auf tatsächliche Änderungen reagieren.
     """
     USER_TYPE_CHOICES = (
         ('customer', 'customer'),
         ('business', 'business'),
     )
+    # Felder des Benutzers, die im Profil ausgegeben werden.
+    PROFILE_FIELDS = ('username', 'first_name', 'last_name', 'email', 'type')
+
     email = models.EmailField(
         _("email address"),
         unique=True,
@@ -17,5 +46,29 @@ class CustomUser(AbstractUser):
     )
     type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES, default='customer')
 
+    objects = CustomUserManager()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded_profile_values = {name: self.__dict__.get(name) for name in self.PROFILE_FIELDS}
+
+    def get_changed_profile_fields(self, update_fields=None):
+        """
+        Gibt die Profilfelder zurück, deren Wert vom geladenen abweicht,
+        beschränkt auf `update_fields`, falls nur diese gespeichert werden.
+        """
+        return {
+            name for name in self.PROFILE_FIELDS
+            if (update_fields is None or name in update_fields)
+            and self.__dict__.get(name) != self.loaded_profile_values[name]
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        for name in self.PROFILE_FIELDS:
+            if update_fields is None or name in update_fields:
+                self.loaded_profile_values[name] = self.__dict__.get(name)
+
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username